@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 from ReFit.jwt_config import SIMPLE_JWT
 
 # ==========================================================================
@@ -83,6 +84,7 @@ WSGI_APPLICATION = 'ReFit.wsgi.application'
 # Autenticación y usuarios
 # --------------------------------------------------------------------------
 AUTH_USER_MODEL = 'refit_app.User'
+AUTHENTICATION_BACKENDS = ['refit_app.backends.EmailModelBackend']
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -91,8 +93,10 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Argon2id como hasher principal; los demás solo verifican hashes heredados
+# y Django los re-hashea con Argon2 al iniciar sesión.
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'refit_app.hashers.RefitArgon2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
@@ -110,6 +114,14 @@ USE_TZ = True
 # Archivos estáticos y media
 # --------------------------------------------------------------------------
 MEDIA_URL = '/media/'
+# Base absoluta de las URLs públicas de imágenes (ej. https://cdn.refit.app/media/),
+# servida por el CDN/nginx con Cache-Control: public, max-age=31536000, immutable.
+# La app móvil no resuelve URLs relativas: solo en desarrollo (DEBUG) se admite
+# omitirla y usar MEDIA_URL, servido por static() en ReFit/urls.py
+MEDIA_CDN_URL = config('MEDIA_CDN_URL', default='')
+
+if not MEDIA_CDN_URL and not DEBUG:
+    raise ImproperlyConfigured("MEDIA_CDN_URL es obligatorio cuando DEBUG=False.")
 #MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATIC_URL = '/static/'
@@ -117,6 +129,30 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# --------------------------------------------------------------------------
+# Caché – Redis compartido; memoria local solo en desarrollo (DEBUG)
+# --------------------------------------------------------------------------
+# Las versiones de caché, los ETag y el límite de intentos de login deben ser
+# iguales en todos los workers: con LocMemCache cada proceso tendría los suyos
+REDIS_URL = config('REDIS_URL', default='')
+
+if not REDIS_URL and not DEBUG:
+    raise ImproperlyConfigured("REDIS_URL es obligatorio cuando DEBUG=False.")
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # --------------------------------------------------------------------------
 # CORS – Permitir conexiones desde frontend local
 # --------------------------------------------------------------------------
@@ -132,6 +168,11 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # orjson: codificación JSON en C/Rust con soporte nativo de date/datetime/UUID
+    'DEFAULT_RENDERER_CLASSES': (
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 # --------------------------------------------------------------------------
@@ -160,6 +201,13 @@ LOGGING = {
             'formatter': 'verbose',
             'delay': True,  # se agrega para retrasar la apertura del archivo
         },
+        # Auditoría: se encola en el request y se escribe a disco en un hilo aparte
+        'audit': {
+            'level': 'INFO',
+            '()': 'refit_app.log_handlers.audit_queue_handler',
+            'filename': BASE_DIR / 'logs' / 'audit.log',
+            'formatter': 'verbose',
+        },
     },
     'loggers': {
         'django': {
@@ -172,5 +220,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'refit.audit': {
+            'handlers': ['audit'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
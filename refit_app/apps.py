@@ -4,6 +4,5 @@ class ReFitAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'refit_app'
 
-def ready(self):
-    import refit_app.signals
-    
\ No newline at end of file
+    def ready(self):
+        import refit_app.signals
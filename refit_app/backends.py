@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+# ==========================================================================
+# BACKENDS – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Backend de autenticación por email usado por authenticate().
+# ==========================================================================
+
+UserModel = get_user_model()
+
+
+class EmailModelBackend(ModelBackend):
+    """
+    Igual que ModelBackend, pero al verificar credenciales carga solo las columnas
+    que usan el login y el admin. Los datos de la respuesta se consultan aparte con
+    LoginResponseSerializer.setup_eager_loading().
+    """
+    campos_autenticacion = (
+        'id', 'email', 'password', 'is_active', 'is_staff', 'is_superuser',
+        'blocked', 'lock_date', 'first_login', 'last_login',
+    )
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            # Mismo criterio que UserManager.get_by_natural_key: email sin distinguir mayúsculas
+            user = UserModel._default_manager.only(*self.campos_autenticacion).get(
+                **{f"{UserModel.USERNAME_FIELD}__iexact": username}
+            )
+        except (UserModel.DoesNotExist, UserModel.MultipleObjectsReturned):
+            # Se calcula un hash igual para no revelar por tiempo si el email existe.
+            # Emails que solo difieren en mayúsculas (previos a user_email_upper_unique,
+            # ver el comando emails_duplicados) cuentan como login fallido, no como error 500
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,16 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+# ==========================================================================
+# HASHERS – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Hashers de contraseñas con parámetros ajustados para ReFit.
+# ==========================================================================
+
+class RefitArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id con costo ajustado para ~300ms por verificación en producción.
+    Los hashes existentes con otros parámetros se actualizan en el próximo login.
+    """
+    time_cost = 2
+    memory_cost = 65536
+    parallelism = 4
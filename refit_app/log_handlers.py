@@ -0,0 +1,60 @@
+import atexit
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# ==========================================================================
+# LOG_HANDLERS – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Handlers de logging usados desde settings.LOGGING.
+# ==========================================================================
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler que arranca su QueueListener con el primer registro de cada proceso.
+    Con gunicorn --preload los settings se importan antes del fork y los hilos no
+    sobreviven al fork: cada worker crea aquí su propia cola y su propio hilo.
+    """
+
+    def __init__(self, destino):
+        super().__init__(queue.SimpleQueue())
+        self.destino = destino
+        self._pid = None
+        self._listener = None
+        self._arranque = threading.Lock()
+
+    def _asegurar_listener(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._arranque:
+            if self._pid == pid:
+                return
+            # En un worker recién forkeado la cola heredada no tiene quién la vacíe
+            self.queue = queue.SimpleQueue()
+            self._listener = QueueListener(self.queue, self.destino, respect_handler_level=True)
+            self._listener.start()
+            atexit.register(self.detener)
+            self._pid = pid
+
+    def detener(self):
+        # Vacía la cola pendiente al salir; llamarlo más de una vez no tiene efecto
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+
+    def emit(self, record):
+        self._asegurar_listener()
+        super().emit(record)
+
+
+def audit_queue_handler(filename, when='midnight', backup_count=5):
+    """
+    Devuelve un LazyQueueHandler: el request solo encola el registro y un hilo
+    (QueueListener) lo escribe en el archivo rotativo, fuera del request.
+    El formato se aplica en el QueueHandler (ver 'formatter' en settings.LOGGING).
+    """
+    os.makedirs(os.path.dirname(os.fspath(filename)) or '.', exist_ok=True)
+    destino = TimedRotatingFileHandler(filename, when=when, backupCount=backup_count, delay=True)
+    return LazyQueueHandler(destino)
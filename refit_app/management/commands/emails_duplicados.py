@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+from refit_app.models import User
+
+# ==========================================================================
+# EMAILS_DUPLICADOS – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Lista los usuarios cuyos emails solo difieren en mayúsculas.
+#              Debe ejecutarse (y quedar sin duplicados) antes de aplicar la
+#              migración que crea user_email_upper_unique, que fallaría:
+#              python manage.py emails_duplicados
+# ==========================================================================
+
+class Command(BaseCommand):
+    help = "Reporta emails de usuario duplicados sin distinguir mayúsculas."
+
+    def handle(self, *args, **options):
+        duplicados = (
+            User.objects.annotate(email_upper=Upper('email'))
+            .values('email_upper')
+            .annotate(total=Count('id'))
+            .filter(total__gt=1)
+            .values_list('email_upper', flat=True)
+        )
+        duplicados = list(duplicados)
+        if not duplicados:
+            self.stdout.write("No hay emails duplicados: se puede aplicar user_email_upper_unique.")
+            return
+
+        # La unificación de cuentas es manual: hay que decidir qué usuario conserva canjes y objetivos
+        usuarios = (
+            User.objects.annotate(email_upper=Upper('email'))
+            .filter(email_upper__in=duplicados)
+            .only('id', 'email', 'is_active', 'last_login')
+            .order_by('email_upper', 'id')
+        )
+        for usuario in usuarios:
+            self.stdout.write(
+                f"{usuario.email_upper}: id={usuario.id} email={usuario.email} "
+                f"activo={usuario.is_active} ultimo_login={usuario.last_login}"
+            )
+        raise CommandError(
+            f"{len(duplicados)} email(s) duplicado(s): unificar o renombrar las cuentas "
+            f"antes de migrar user_email_upper_unique."
+        )
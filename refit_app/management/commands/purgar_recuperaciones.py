@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from refit_app.models import PasswordRecovery
+
+# ==========================================================================
+# PURGAR_RECUPERACIONES – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Elimina los tokens de recuperación de contraseña vencidos.
+#              Pensado para ejecutarse periódicamente (cron / systemd timer):
+#              python manage.py purgar_recuperaciones
+# ==========================================================================
+
+class Command(BaseCommand):
+    help = "Elimina las solicitudes de recuperación de contraseña vencidas."
+
+    def handle(self, *args, **options):
+        # Recorre el índice de expires_at: solo toca las filas vencidas
+        eliminadas, _ = PasswordRecovery.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(f"Solicitudes de recuperación vencidas eliminadas: {eliminadas}")
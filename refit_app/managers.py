@@ -34,12 +34,22 @@ class UserManager(BaseUserManager):
             if value == '':
                 extra_fields[key] = None
 
-        email = self.normalize_email(email)
+        email = self.normalize_email(email).strip().lower()
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
         return user
 
+    def get_by_natural_key(self, username):
+        """
+        Busca al usuario por email sin distinguir mayúsculas (usado por authenticate).
+        """
+        try:
+            return self.get(**{f"{self.model.USERNAME_FIELD}__iexact": username})
+        except self.model.MultipleObjectsReturned:
+            # Emails duplicados por mayúsculas (ver el comando emails_duplicados): no hay un único usuario
+            raise self.model.DoesNotExist(_('Hay más de un usuario con ese correo electrónico'))
+
     def create_superuser(self, email, password=None, **extra_fields):
         """
         Crea y devuelve un superusuario con el correo electrónico y la contraseña dados.
@@ -2,9 +2,11 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.db.models.functions import Upper
 from refit_app.managers import UserManager
 from django.utils.translation import gettext as _
-import uuid
+import hashlib
+from datetime import timedelta
 
 # ==========================================================================
 # MODELS – ReFit App (reestructurado según SQL)
@@ -63,7 +65,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     password = models.CharField(max_length=128, verbose_name="Contraseña")
     fecha_nacimiento = models.DateField()
     genero = models.CharField(max_length=20, choices=GENDER_CHOICES, verbose_name="Género")
+    # unique=True ya crea un índice B-tree: las búsquedas por código no requieren otro índice
     codigo_referido = models.CharField(max_length=10, unique=True, null=True, blank=True)
+    # Las ForeignKey se indexan por defecto (db_index=True), lo que cubre el listado de referidos
     fk_usuario_referente = models.ForeignKey(
         'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='referidos'
     )
@@ -100,21 +104,58 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = '"USUARIOS"'
+        constraints = [
+            # Unicidad sin distinguir mayúsculas; en PostgreSQL email__iexact usa UPPER(email) y aprovecha este índice
+            models.UniqueConstraint(Upper('email'), name='user_email_upper_unique'),
+        ]
+        indexes = [
+            # Ranking: conteo de usuarios no staff con más pasos y orden del leaderboard
+            models.Index(fields=['is_staff', '-pasos_totales'], name='user_staff_pasos_idx'),
+        ]
+
+    def clean(self):
+        super().clean()
+        self.email = self.__class__.objects.normalize_email(self.email).strip().lower()
 
 # --------------------------------------------------------------------------
 # Modelo de Recuperación de Contraseña (PASSWORD_RECOVERY)
 # --------------------------------------------------------------------------
+RECUPERACION_VIGENCIA = timedelta(minutes=60)
+
+
+def vencimiento_recuperacion():
+    """
+    Fecha de vencimiento de un token de recuperación emitido ahora.
+    """
+    return timezone.now() + RECUPERACION_VIGENCIA
+
+
 class PasswordRecovery(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.UUIDField(default=uuid.uuid4, unique=True)
+    # Solo se guarda el SHA-256 del token enviado por correo: un volcado de la base
+    # no permite restablecer contraseñas pendientes
+    token = models.CharField(max_length=64, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Indexado para filtrar vigentes en la consulta y purgar vencidos (ver purgar_recuperaciones)
+    expires_at = models.DateTimeField(default=vencimiento_recuperacion, db_index=True)
     used = models.BooleanField(default=False)
 
     def __str__(self):
         return f"Token para {self.usuario.email}"
+
+    @staticmethod
+    def hash_token(token):
+        """
+        Devuelve el SHA-256 (hex) con el que se almacena y compara el token de recuperación.
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
     
     class Meta:
         db_table = '"PASSWORD_RECOVERY"'
+        constraints = [
+            # Una solicitud vigente por usuario: una nueva solicitud reemplaza el token anterior
+            models.UniqueConstraint(fields=['user'], name='password_recovery_user_uniq'),
+        ]
     
 # --------------------------------------------------------------------------
 # PRODUCTOS
@@ -256,6 +297,10 @@ class Parametro(models.Model):
 
     class Meta:
         db_table = '"PARAMETROS"'
+        indexes = [
+            # Búsquedas por prefijo (codigo__startswith -> LIKE 'RECOMPENSA_%') en PostgreSQL
+            models.Index(fields=['codigo'], name='parametro_codigo_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
 # --------------------------------------------------------------------------
 # OBJETIVOS_DIARIOS
@@ -268,7 +313,9 @@ class ObjetivoDiario(models.Model):
     pk_objetivos_diarios = models.AutoField(primary_key=True, verbose_name="ID objetivo diario")
     nombre = models.CharField(max_length=100, verbose_name="Nombre")
     descripcion = models.TextField(null=True, blank=True, verbose_name="Descripción")
-    tipo = models.CharField(max_length=20, choices=TIPO_OBJETIVO_CHOICES, default='cuantitativo')
+    tipo = models.CharField(
+        max_length=20, choices=TIPO_OBJETIVO_CHOICES, default='cuantitativo', db_default='cuantitativo'
+    )
     requisito = models.CharField(max_length=255, verbose_name="Requisito del objetivo")
     valor_requerido = models.IntegerField(default=10000, verbose_name="Cantidad requerida (solo para cuantitativos)")
     premio = models.IntegerField()
@@ -337,7 +384,10 @@ class Pasos(models.Model):
         db_table = '"PASOS"'
         # Se agrega la restricción para que "pasos" sea siempre >= 0
         constraints = [
-            models.CheckConstraint(check=models.Q(pasos__gte=0), name='check_pasos_non_negative')
+            models.CheckConstraint(check=models.Q(pasos__gte=0), name='check_pasos_non_negative'),
+            # Un registro por usuario y día (la sincronización usa get_or_create sobre este par).
+            # El índice incluye 'pasos' para resolver la consulta diaria con un Index-Only Scan.
+            models.UniqueConstraint(fields=['fk_usuarios', 'fecha'], include=['pasos'], name='pasos_user_date_uniq'),
         ]
 
 
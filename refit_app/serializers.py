@@ -1,3 +1,5 @@
+import hmac
+from copy import copy
 from rest_framework import serializers
 from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
@@ -7,8 +9,13 @@ from refit_app.models import (
     Transaccion, ProductoCategoria, Canje, ProductoImagen, ObjetivoDiario, FAQ
 )
 from datetime import date
+from django.db.models import (
+    BooleanField, Case, CharField, ExpressionWrapper, F, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+)
+from django.db.models.functions import Coalesce, Concat
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from refit_app.services.objetivos_service import objetivos_con_relaciones
 
 # ============================================================================
 # SERIALIZERS – ReFit App
@@ -18,6 +25,81 @@ from django.shortcuts import get_object_or_404
 #              Se incluyen validaciones detalladas, mensajes de error claros para producción
 #              y docstrings que explican la función de cada serializador.
 # ============================================================================
+# ------------------------------------------------------------------------------
+# Funciones auxiliares
+# ------------------------------------------------------------------------------
+# Bases de las URLs de imágenes, resueltas una vez al importar (se usan por fila en los listados).
+# Las imágenes públicas (perfil, productos, categorías) salen por el CDN: MEDIA_CDN_URL es
+# obligatorio fuera de DEBUG, así la app móvil siempre recibe URLs absolutas.
+_MEDIA_URL = settings.MEDIA_URL
+_PUBLIC_MEDIA_URL = settings.MEDIA_CDN_URL or settings.MEDIA_URL
+
+def build_profile_picture_url(imagen):
+    """
+    Construye la URL pública de una imagen de perfil (MEDIA_CDN_URL o MEDIA_URL).
+    El parámetro ?v=<uuid> invalida la caché del CDN cuando se reemplaza la imagen.
+    """
+    if imagen and imagen.nombre_logico:
+        extension = imagen.extension.strip('.') if imagen.extension else 'jpg'
+        return f"{_PUBLIC_MEDIA_URL}public/{imagen.nombre_logico}.{extension}?v={imagen.uuid}"
+    return None
+
+def leaderboard_position_expression():
+    """
+    Expresión SQL con la posición del usuario en el ranking por pasos totales:
+    1 + cantidad de usuarios (no staff) con más pasos, cubierta por el índice user_staff_pasos_idx.
+    Los empates comparten posición; None para staff.
+    """
+    usuarios_adelante = User.objects.filter(
+        is_staff=False, pasos_totales__gt=OuterRef('pasos_totales')
+    ).order_by().annotate(total=Func(F('pk'), function='COUNT')).values('total')
+    return Case(
+        When(is_staff=True, then=Value(None)),
+        default=Subquery(usuarios_adelante) + 1,
+        output_field=IntegerField()
+    )
+
+def annotate_user_stats(queryset, hoy=None):
+    """
+    Anota los pasos de hoy (daily_steps) y la posición en el ranking (leaderboard_position)
+    con subconsultas, y trae la imagen de perfil en el mismo JOIN. Sirve tanto para un
+    usuario como para listas: los datos de todas las filas se resuelven en una sola consulta.
+    'hoy' permite reutilizar la fecha ya calculada por la vista.
+    """
+    pasos_hoy = Pasos.objects.filter(
+        fk_usuarios=OuterRef('pk'), fecha=hoy or date.today()
+    ).values('pasos')[:1]
+
+    return queryset.select_related('image').annotate(
+        daily_steps=Coalesce(Subquery(pasos_hoy), 0),
+        leaderboard_position=leaderboard_position_expression(),
+    )
+
+class ProfilePictureField(serializers.Field):
+    """
+    Campo de solo lectura que recibe la Imagen de perfil y devuelve su URL pública.
+    Reemplaza a los SerializerMethodField equivalentes sin el despacho por método.
+    """
+    def to_representation(self, value):
+        return build_profile_picture_url(value)
+
+class CachedFieldsMixin:
+    """
+    Guarda por clase el diccionario de campos que arma get_fields(), evitando repetir la
+    introspección del modelo (ModelSerializer) o el deepcopy de los campos declarados en
+    cada instancia. Cada instancia recibe copias superficiales, que luego DRF enlaza (bind)
+    a sí misma; los serializadores que usan el mixin no modifican sus campos en tiempo de ejecución.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        cached = CachedFieldsMixin._fields_cache.get(cls)
+        if cached is None:
+            cached = super().get_fields()
+            CachedFieldsMixin._fields_cache[cls] = cached
+        return {name: copy(field) for name, field in cached.items()}
+
 # ------------------------------------------------------------------------------
 # Registro de Usuario
 # ------------------------------------------------------------------------------
@@ -34,8 +116,9 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     """
     email = serializers.EmailField(
         required=True,
-        validators=[UniqueValidator(queryset=User.objects.all(), message="El email ingresado ya existe. Por favor, use otro email.")]
+        validators=[UniqueValidator(queryset=User.objects.all(), lookup='iexact', message="El email ingresado ya existe. Por favor, use otro email.")]
     )
+    # Los validadores de AUTH_PASSWORD_VALIDATORS (incluida la longitud mínima de 8) se aplican en una sola pasada
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     name = serializers.CharField(source='nombre')
     surname = serializers.CharField(source='apellidos')
@@ -49,35 +132,27 @@ class UserRegisterSerializer(serializers.ModelSerializer):
                   'birthDate', 'gender', 'referralCode')
 
     def validate_email(self, value):
-        if User.objects.filter(email=value, is_active=True).exists():
+        if User.objects.filter(email__iexact=value, is_active=True).exists():
             raise serializers.ValidationError("Ya existe un usuario activo con este email.")
         return value
     
-    def validate_password(self, value):
-        """
-        Valida que la contraseña tenga al menos 8 caracteres.
-        """
-        if len(value) < 8:
-            raise serializers.ValidationError("La contraseña debe tener al menos 8 caracteres.")
-        return value
-
     def create(self, validated_data):
         referral_code = validated_data.pop("codigo_referido", "").strip()
-        referente = None
+        referente_id = None
 
-        # Buscar usuario referente si se proporcionó un código válido
+        # Buscar usuario referente si se proporcionó un código válido (solo se necesita su PK)
         if referral_code:
-            referente = User.objects.filter(codigo_referido=referral_code.upper()).first()
+            referente_id = User.objects.filter(
+                codigo_referido=referral_code.upper()
+            ).values_list('pk', flat=True).first()
 
         # Generar código de referido único para el nuevo usuario
         validated_data["codigo_referido"] = self.generar_codigo_unico()
 
         # Asignar usuario referente si corresponde
-        validated_data["fk_usuario_referente"] = referente
-
-        # Normalizar email
-        validated_data['email'] = validated_data['email'].lower().strip()
+        validated_data["fk_usuario_referente_id"] = referente_id
 
+        # El email se normaliza en UserManager.create_user
         return User.objects.create_user(**validated_data)
 
     def generar_codigo_unico(self):
@@ -115,70 +190,51 @@ class RegisterResponseSerializer(serializers.ModelSerializer):
 # Incluye datos calculados como pasos diarios y ranking en el leaderboard.
 # Mapea campos del modelo a nombres más amigables para el frontend.
 
-class LoginResponseSerializer(serializers.ModelSerializer):
+class LoginResponseSerializer(CachedFieldsMixin, serializers.Serializer):
     """
     Serializador para la respuesta de login.
     
     Mapea campos del modelo a nombres más amigables y calcula datos adicionales como
-    la posición en el leaderboard.
+    la posición en el leaderboard. Es de solo lectura, por lo que se declara como
+    Serializer simple (sin introspección del modelo) en el orden de la respuesta.
+
+    Los datos calculados provienen de las anotaciones de setup_eager_loading(),
+    de modo que serializar no ejecuta consultas adicionales.
     """
+    id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(source='nombre')
     surname = serializers.CharField(source='apellidos')
-    birthDate = serializers.DateField(source='fecha_nacimiento', format="%Y-%m-%d", required=False)
-    gender = serializers.CharField(source='genero', required=False)
-    firstLogin = serializers.BooleanField(source='first_login')
-    lastLogin  = serializers.DateTimeField(source='last_login', format="%Y-%m-%d %H:%M:%S", read_only=True)
-    updatePassword = serializers.BooleanField(source='update_password')
-    referred = serializers.SerializerMethodField()
-    referralCode = serializers.CharField(source='codigo_referido')
-    profilePicture = serializers.SerializerMethodField()
+    email = serializers.EmailField()
     coins = serializers.IntegerField(source='monedas_actuales')
-    dailySteps = serializers.SerializerMethodField()
+    dailySteps = serializers.IntegerField(source='daily_steps', read_only=True)
     dailyGoal = serializers.IntegerField(source='objetivo_diario')
-    leaderBoardPosition = serializers.SerializerMethodField()
     monthlySteps = serializers.IntegerField(source='pasos_totales')
+    leaderBoardPosition = serializers.IntegerField(source='leaderboard_position', read_only=True)
+    firstLogin = serializers.BooleanField(source='first_login')
+    profilePicture = ProfilePictureField(source='image', read_only=True)
     lastSync = serializers.DateTimeField(source='last_sync', format="%Y-%m-%d %H:%M:%S", required=False)
+    lastLogin  = serializers.DateTimeField(source='last_login', format="%Y-%m-%d %H:%M:%S", read_only=True)
+    updatePassword = serializers.BooleanField(source='update_password')
+    referralCode = serializers.CharField(source='codigo_referido')
+    referred = serializers.BooleanField(read_only=True)
+    birthDate = serializers.DateField(source='fecha_nacimiento', format="%Y-%m-%d", required=False)
+    gender = serializers.CharField(source='genero', required=False)
 
-    class Meta:
-        model = User
-        fields = (
-            'id', 'name', 'surname', 'email', 'coins', 'dailySteps', 'dailyGoal',
-            'monthlySteps', 'leaderBoardPosition', 'firstLogin', 'profilePicture', 'lastSync',
-            'lastLogin', 'updatePassword', 'referralCode', 'referred', 'birthDate', 'gender'
-        )
-    
-    def get_profilePicture(self, obj):
-        request = self.context.get('request')
-        if obj.image:
-            nombre_logico = obj.image.nombre_logico
-            extension = obj.image.extension.strip('.') if obj.image.extension else 'jpg'
-            uuid_str = str(obj.image.uuid) if obj.image.uuid else ''
-            if nombre_logico:
-                return f"http://3.17.152.152/media/public/{nombre_logico}.{extension}?v={uuid_str}"
-        return None
-
-    def get_dailySteps(self, obj):
-        """
-        Retorna el total de pasos del día actual del usuario.
-        """
-        pasos = Pasos.objects.filter(fk_usuarios=obj, fecha=date.today()).first()
-        return pasos.pasos if pasos else 0
-
-    def get_leaderBoardPosition(self, obj):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
         """
-        Calcula la posición del usuario en el ranking basado en pasos totales.
+        Anota en una sola consulta los pasos de hoy, la posición en el ranking y si tiene referente.
+        Solo se traen las columnas que usa la respuesta (no el hash de contraseña ni datos internos).
         """
-        usuarios = User.objects.filter(is_staff=False).order_by('-pasos_totales').values_list('pk', flat=True)
-        try:
-            return list(usuarios).index(obj.pk) + 1
-        except ValueError:
-            return None
-    
-    def get_referred(self, obj):
-        return obj.fk_usuario_referente is not None
-    
-    def get_lastSync(self, obj):
-        return obj.last_sync.isoformat() if obj.last_sync else None
+        queryset = queryset.only(
+            'id', 'nombre', 'apellidos', 'email', 'monedas_actuales', 'objetivo_diario',
+            'pasos_totales', 'first_login', 'last_sync', 'last_login', 'update_password',
+            'codigo_referido', 'fecha_nacimiento', 'genero',
+            'image__uuid', 'image__extension', 'image__nombre_logico'
+        )
+        return annotate_user_stats(queryset).annotate(
+            referred=ExpressionWrapper(Q(fk_usuario_referente__isnull=False), output_field=BooleanField()),
+        )
 
 # ------------------------------------------------------------------------------
 # Perfil del Usuario (para ediciones y detalles)
@@ -186,17 +242,18 @@ class LoginResponseSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializador para la visualización y edición del perfil de usuario.
+    Espera un queryset preparado con setup_eager_loading() para los datos calculados.
     """
     name = serializers.CharField(source='nombre')
     surname = serializers.CharField(source='apellidos')
     birthDate = serializers.DateField(source='fecha_nacimiento', format="%Y-%m-%d", required=False)
     gender = serializers.CharField(source='genero', required=False)
-    profilePicture = serializers.SerializerMethodField()
+    profilePicture = ProfilePictureField(source='image', read_only=True)
     referralCode = serializers.CharField(source='codigo_referido')
     coins = serializers.IntegerField(source='monedas_actuales')
-    dailySteps = serializers.SerializerMethodField()
+    dailySteps = serializers.IntegerField(source='daily_steps', read_only=True)
     dailyGoal = serializers.IntegerField(source='objetivo_diario')
-    leaderBoardPosition = serializers.SerializerMethodField()
+    leaderBoardPosition = serializers.IntegerField(source='leaderboard_position', read_only=True)
     monthlySteps = serializers.IntegerField(source='pasos_totales')
     lastSync = serializers.DateTimeField(source='last_sync', format="%Y-%m-%d %H:%M:%S", required=False)
 
@@ -208,33 +265,18 @@ class UserSerializer(serializers.ModelSerializer):
             'leaderBoardPosition', 'monthlySteps' , 'lastSync'
             )
 
-    def get_profilePicture(self, obj):
-        request = self.context.get('request')
-        if obj.image:
-            nombre_logico = obj.image.nombre_logico
-            extension = obj.image.extension.strip('.') if obj.image.extension else 'jpg'
-            uuid_str = str(obj.image.uuid) if obj.image.uuid else ''
-            if nombre_logico:
-                return f"http://3.17.152.152/media/public/{nombre_logico}.{extension}?v={uuid_str}"
-        return None
-
-    
-    def get_dailySteps(self, obj):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
         """
-        Retorna el total de pasos del día actual del usuario.
+        Anota pasos de hoy y posición en el ranking en la misma consulta del usuario,
+        trayendo solo las columnas que usa la respuesta.
         """
-        pasos = Pasos.objects.filter(fk_usuarios=obj, fecha=date.today()).first()
-        return pasos.pasos if pasos else 0
-
-    def get_leaderBoardPosition(self, obj):
-        """
-        Calcula la posición del usuario en el ranking basado en pasos totales.
-        """
-        usuarios = User.objects.filter(is_staff=False).order_by('-pasos_totales').values_list('pk', flat=True)
-        try:
-            return list(usuarios).index(obj.pk) + 1
-        except ValueError:
-            return None
+        queryset = queryset.only(
+            'id', 'email', 'nombre', 'apellidos', 'fecha_nacimiento', 'genero', 'codigo_referido',
+            'monedas_actuales', 'objetivo_diario', 'pasos_totales', 'last_sync',
+            'image__uuid', 'image__extension', 'image__nombre_logico'
+        )
+        return annotate_user_stats(queryset)
         
     def get_lastSync(self, obj):
         return obj.last_sync.isoformat() if obj.last_sync else None
@@ -244,60 +286,51 @@ class UserSerializer(serializers.ModelSerializer):
 # ------------------------------------------------------------------------------
 # Devuelve información reducida y relevante para los rankings de usuarios,
 # combinando pasos totales, monedas y nombre completo.
-class LeaderBoardSerializer(serializers.ModelSerializer):
+class LeaderBoardSerializer(CachedFieldsMixin, serializers.Serializer):
     """
-    Serializador para la visualización del Leaderbord.
+    Serializador para la visualización del Leaderbord (solo lectura).
     """
-    name = serializers.SerializerMethodField()
-    image = serializers.SerializerMethodField()
+    id = serializers.IntegerField(read_only=True)
+    image = ProfilePictureField(read_only=True)
+    name = serializers.CharField(source='full_name', read_only=True)
     steps = serializers.IntegerField(source='pasos_totales')
 
-    class Meta:
-        model = User
-        fields = ('id',  'image', 'name', 'steps')
-
-    def get_name(self, obj):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
         """
-        Retorna los nombres de usuarios para el leaderboard. 
+        Limita el queryset a las columnas que usa el serializador, trae la imagen en el mismo JOIN
+        y arma el nombre completo en SQL.
         """
-        return f"{obj.nombre} {obj.apellidos}"
-
-    def get_image(self, obj):
-        """
-        Devuelve la URL pública completa de la imagen de perfil del usuario.
-        """
-        request = self.context.get('request')  # para que la URL sea siempre completa
-        if obj.image and obj.image.nombre_logico:
-            filename = f"{obj.image.nombre_logico}{obj.image.extension}"
-            url = f"/media/public/{filename}"
-            if request is not None:
-                return request.build_absolute_uri(url)
-            return f"http://3.17.152.152{url}"
-        return None
+        return queryset.select_related('image').only(
+            'id', 'pasos_totales',
+            'image__uuid', 'image__extension', 'image__nombre_logico'
+        ).annotate(
+            full_name=Concat('nombre', Value(' '), 'apellidos', output_field=CharField())
+        )
 
 # ------------------------------------------------------------------------------
 # Edición de Perfil
 # ------------------------------------------------------------------------------
-class EditProfilePictureSerializer(serializers.ModelSerializer):
+class EditProfilePictureSerializer(serializers.Serializer):
     """
     Serializador para editar la imagen de perfil del usuario.
     """
-    class Meta:
-        model = User
-        fields = ('image',)
+    image = serializers.PrimaryKeyRelatedField(queryset=Imagen.objects.all(), allow_null=True)
+
+    def update(self, instance, validated_data):
+        if 'image' in validated_data:
+            instance.image = validated_data['image']
+            instance.save(update_fields=['image'])
+        return instance
 
 # Serializer utilizado para actualizar el objetivo diario del usuario.
-# Usa el campo 'objetivo_diario' directamente del modelo.
-class EditDailyObjetiveSerializer(serializers.ModelSerializer):
+# Serializer simple (sin introspección del modelo) que escribe solo la columna 'objetivo_diario'.
+class EditDailyObjetiveSerializer(serializers.Serializer):
     """
     Serializador para editar el objetivo diario del usuario.
     """
     dailyGoal = serializers.IntegerField(source='objetivo_diario')
     
-    class Meta:
-        model = User
-        fields = ['dailyGoal']
-    
     def validate_dailyGoal(self, value):
         """
         Validaciones para el objetivo diario.
@@ -306,6 +339,13 @@ class EditDailyObjetiveSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El objetivo diario debe ser mayor a 0.")
         return value
 
+    def update(self, instance, validated_data):
+        # Con partial=True el campo puede no venir; en ese caso no se escribe nada
+        if 'objetivo_diario' in validated_data:
+            instance.objetivo_diario = validated_data['objetivo_diario']
+            instance.save(update_fields=['objetivo_diario'])
+        return instance
+
 
 # Serializer para editar los datos básicos del perfil del usuario.
 # Incluye: nombre, apellidos y correo electrónico.
@@ -321,15 +361,6 @@ class EditPersonalDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('name', 'surname', 'birthDate', 'gender')
-    
-    def validate_email(self, value):
-        """
-        Validaciones para el correo electrónico.
-        """
-        user = self.instance
-        if User.objects.exclude(pk=user.pk).filter(email=value).exists():
-            raise serializers.ValidationError("Este email ya está registrado por otro usuario.")
-        return value
 
 # ------------------------------------------------------------------------------
 # Cambio de contraseña con validación
@@ -354,7 +385,8 @@ class ChangePasswordSerializer(serializers.Serializer):
         """
         Validaciones combinadas para la contraseña.
         """
-        if data['oldPassword'] == data['newPassword']:
+        # Comparación en tiempo constante (sobre bytes: compare_digest no acepta str no ASCII)
+        if hmac.compare_digest(data['oldPassword'].encode(), data['newPassword'].encode()):
             raise serializers.ValidationError("La nueva contraseña debe ser distinta de la anterior.")
         return data
 
@@ -380,7 +412,7 @@ class ContactUsSerializer(serializers.Serializer):
 # ------------------------------------------------------------------------------
 # Productos
 # ------------------------------------------------------------------------------
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializador para la visualización de productos.
     """
@@ -391,21 +423,25 @@ class ProductSerializer(serializers.ModelSerializer):
     featured = serializers.BooleanField(source='destacado')
     imageUrl = serializers.SerializerMethodField()
     featuredImageUrl = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
 
     class Meta:
         model = Producto
         fields = [
             'id', 'code', 'name', 'description', 'price',
-            'featured', 'imageUrl', 'featuredImageUrl'
+            'featured', 'imageUrl', 'featuredImageUrl', 'category'
         ]
 
     def get_imageUrl(self, obj):
         """
         Retorna la URL de la primera imagen vinculada en la tabla PRODUCTOS_IMAGENES.
+        Usa 'imagenes_prefetch' si la vista precargó la primera imagen (ver ProductView).
         """
-        from refit_app.models import ProductoImagen
-
-        primera = ProductoImagen.objects.filter(fk_productos=obj).select_related('fk_imagenes').first()
+        imagenes = getattr(obj, 'imagenes_prefetch', None)
+        if imagenes is None:
+            primera = ProductoImagen.objects.filter(fk_productos=obj).select_related('fk_imagenes').first()
+        else:
+            primera = imagenes[0] if imagenes else None
         if primera and primera.fk_imagenes:
             imagen = primera.fk_imagenes
             return f"/media/public/{imagen.uuid}.{imagen.extension.strip('.')}"
@@ -415,16 +451,20 @@ class ProductSerializer(serializers.ModelSerializer):
         """
         Retorna la URL de la imagen destacada asociada directamente al producto.
         """
-        if obj.imagen_destacada and obj.imagen_destacada.nombre_logico and obj.imagen_destacada.extension:
-            return f"http://3.17.152.152/media/public/assets/{obj.imagen_destacada.nombre_logico}{obj.imagen_destacada.extension}"
+        imagen = obj.imagen_destacada
+        if imagen and imagen.nombre_logico and imagen.extension:
+            return f"{_PUBLIC_MEDIA_URL}public/assets/{imagen.nombre_logico}{imagen.extension}"
         return None
     
-    def get_categoria(self, obj):
+    def get_category(self, obj):
         """
         Devuelve la categoría del producto.
+        Usa 'categorias_prefetch' si la vista precargó las relaciones (ver ProductView).
         """
-        cat = ProductoCategoria.objects.filter(fk_productos=obj).first()
-        return cat.fk_categorias.nombre if cat else None
+        relaciones = getattr(obj, 'categorias_prefetch', None)
+        if relaciones is None:
+            relaciones = obj.categorias_relacionadas.select_related('fk_categorias').order_by('pk_productos_categorias')[:1]
+        return relaciones[0].fk_categorias.nombre if relaciones else None
 
 # ------------------------------------------------------------------------------
 # Categorias
@@ -442,8 +482,9 @@ class CategoriaSerializer(serializers.ModelSerializer):
         fields = ('id', 'code', 'name', 'imageUrl')
     
     def get_imageUrl(self, obj):
-        if obj.imagen and obj.imagen.nombre_logico and obj.imagen.extension:
-            return f"http://3.17.152.152/media/public/assets/{obj.imagen.nombre_logico}{obj.imagen.extension}"
+        imagen = obj.imagen
+        if imagen and imagen.nombre_logico and imagen.extension:
+            return f"{_PUBLIC_MEDIA_URL}public/assets/{imagen.nombre_logico}{imagen.extension}"
         return None
 
 # ----------------------------------------------------------------------------
@@ -494,7 +535,7 @@ class ImagenSerializer(serializers.ModelSerializer):
         """
         Devuelve la URL de la imagen.
         """
-        return f"{settings.MEDIA_URL}{obj.uuid}.{obj.extension}"  # Ajustar según cómo sirvas las imágenes
+        return f"{_MEDIA_URL}{obj.uuid}.{obj.extension}"  # Ajustar según cómo sirvas las imágenes
     
 # ------------------------------------------------------------------------------
 # Producto - Imagenes
@@ -516,7 +557,8 @@ class ProductoImagenSerializer(serializers.ModelSerializer):
         """
         Devuelve la URL de la imagen asociada al producto.
         """
-        return f"{settings.MEDIA_URL}{obj.fk_imagenes.uuid}.{obj.fk_imagenes.extension}"
+        imagen = obj.fk_imagenes
+        return f"{_MEDIA_URL}{imagen.uuid}.{imagen.extension}"
 
 # ------------------------------------------------------------------------------
 # Objetivos Diarios
@@ -573,7 +615,7 @@ class UsuarioObjetivoDiarioSerializer(serializers.ModelSerializer):
 # ------------------------------------------------------------------------------
 # Pasos Diarios
 # ------------------------------------------------------------------------------
-class PasosSerializer(serializers.ModelSerializer):
+class PasosSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializador para la visualización de pasos diarios. 
     """
@@ -655,11 +697,11 @@ class CheckDailyTaskSerializer(serializers.Serializer):
         Valida que la tarea exista y pertenezca al usuario.
         """
         user = self.context["request"].user
-        hoy = date.today()
+        hoy = self.context.get("hoy") or date.today()
 
         objetivo = get_object_or_404(ObjetivoDiario, pk_objetivos_diarios=value, is_active=True)
 
-        self.tarea, created = UsuarioObjetivoDiario.objects.get_or_create(
+        self.tarea, created = objetivos_con_relaciones().get_or_create(
             fk_usuarios=user,
             fk_objetivos_diarios=objetivo,
             fecha_creacion=hoy
@@ -709,11 +751,11 @@ class ExchangeDailyTaskSerializer(serializers.Serializer):
         Valida que la tarea exista, pertenezca al usuario y no haya sido canjeada.
         """
         user = self.context["request"].user
-        hoy = date.today()
+        hoy = self.context.get("hoy") or date.today()
 
         objetivo = get_object_or_404(ObjetivoDiario, pk_objetivos_diarios=value, is_active=True)
 
-        self.tarea = UsuarioObjetivoDiario.objects.filter(
+        self.tarea = objetivos_con_relaciones().filter(
             fk_usuarios=user,
             fk_objetivos_diarios=objetivo,
             fecha_creacion=hoy
@@ -778,7 +820,7 @@ class QualitativeObjectiveSerializer(serializers.Serializer):
 
     def completar(self):
         self.tarea.fecha_completado = timezone.now()
-        self.tarea.save()
+        self.tarea.save(update_fields=['fecha_completado'])
         return self.tarea
 
 # ------------------------------------------------------------------------------
@@ -788,18 +830,21 @@ class ReferredUserSerializer(serializers.ModelSerializer):
     """
     Serializador para la visualización de usuarios referidos. 
     """
-    fullName = serializers.SerializerMethodField()
+    fullName = serializers.CharField(source='full_name', read_only=True)
     createdAt = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ('id', 'email', 'fullName', 'createdAt')
 
-    def get_fullName(self, obj):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
         """
-        Devuelve el nombre completo del usuario.
+        Arma el nombre completo en SQL y trae solo las columnas que usa el serializador.
         """
-        return f"{obj.nombre} {obj.apellidos}"
+        return queryset.only('id', 'email', 'fecha_registro').annotate(
+            full_name=Concat('nombre', Value(' '), 'apellidos', output_field=CharField())
+        )
     
     def get_createdAt(self, obj):
         """
@@ -814,65 +859,51 @@ class ReferredUserSerializer(serializers.ModelSerializer):
 # ------------------------------------------------------------------------------
 class RecompensaParametroSerializer(serializers.ModelSerializer):
     """
-    Serializador para la visualización de parámetros de recompensas. 
+    Serializador para la visualización de parámetros de recompensas.
+    Espera un queryset ya filtrado por codigo__startswith="RECOMPENSA_".
     """
     class Meta:
         model = Parametro
         fields = ('codigo', 'valor')
 
-    def to_representation(self, instance):
-        """
-        Modifica la representación del serializador para incluir solo
-        recompensas específicas. 
-        """
-        rep = super().to_representation(instance)
-        # Se devuelve la representación solo si el código comienza con "RECOMPENSA_"
-        if not rep['codigo'].startswith("RECOMPENSA_"):
-            return None
-        return rep
-
-# ------------------------------------------------------------------------------
-# Historial de Pasos
-# ------------------------------------------------------------------------------
-class HistoricalStepsSerializer(serializers.ModelSerializer):
-    """
-    Serializador para la visualización del historial de pasos diarios. 
-    """
-    date = serializers.DateField(source="fecha")
-    steps = serializers.IntegerField(source="pasos")
-
-    class Meta:
-        model = Pasos
-        fields = ('date', 'steps')
-
 # ------------------------------------------------------------------------------
 # Historial de Canjes
 # ------------------------------------------------------------------------------
-class HistoricalCanjeSerializer(serializers.ModelSerializer):
+class HistoricalCanjeSerializer(CachedFieldsMixin, serializers.Serializer):
     """
-    Serializador para la visualización del historial de canjes. 
+    Serializador para la visualización del historial de canjes.
+    Trabaja sobre las filas (diccionarios) que devuelve setup_eager_loading().
     """
-    producto = serializers.CharField(source='fk_productos.nombre')
+    producto = serializers.CharField()
+    monto = serializers.IntegerField()
+    fecha = serializers.DateTimeField()
     imagen_url = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Canje
-        fields = ('producto', 'monto', 'fecha', 'imagen_url')
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Reduce el queryset de canjes a las columnas que se serializan, sin instanciar modelos.
+        """
+        return queryset.values(
+            'monto', 'fecha',
+            producto=F('fk_productos__nombre'),
+            imagen_uuid=F('fk_productos__imagen_destacada__uuid'),
+            imagen_extension=F('fk_productos__imagen_destacada__extension'),
+        )
 
     def get_imagen_url(self, obj):
         """
         Devuelve la URL de la imagen del producto canjeado.
         """
-        imagen = obj.fk_productos.imagen_destacada
-        if imagen:
-            return f"{settings.MEDIA_URL}{imagen.uuid}.{imagen.extension}"
+        if obj['imagen_uuid']:
+            return f"{_MEDIA_URL}{obj['imagen_uuid']}.{obj['imagen_extension']}"
         return None
 
 # ------------------------------------------------------------------------------
 # Perfil Público
 # ------------------------------------------------------------------------------   
 class PublicUserProfileSerializer(serializers.ModelSerializer):
-    profilePicture = serializers.SerializerMethodField()
+    profilePicture = ProfilePictureField(source='image', read_only=True)
 
     class Meta:
         model = User
@@ -882,20 +913,20 @@ class PublicUserProfileSerializer(serializers.ModelSerializer):
     surname = serializers.CharField(source="apellidos")
     monthlySteps = serializers.IntegerField(source="pasos_totales")
 
-    leaderBoardPosition = serializers.SerializerMethodField()
-
-    def get_profilePicture(self, obj):
-        request = self.context.get("request")
-        if obj.image and obj.image.nombre_logico:
-            return f"http://3.17.152.152/media/public/{obj.image.nombre_logico}{obj.image.extension.strip('.') and '.' or ''}{obj.image.extension}"
-        return None
+    leaderBoardPosition = serializers.IntegerField(source="leaderboard_position", read_only=True)
 
-    def get_leaderBoardPosition(self, obj):
-        usuarios = User.objects.filter(is_staff=False).order_by('-pasos_totales').values_list('pk', flat=True)
-        try:
-            return list(usuarios).index(obj.pk) + 1
-        except ValueError:
-            return None
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Trae la imagen en el mismo JOIN y anota la posición en el ranking por fila,
+        sin recorrer la tabla completa de usuarios.
+        """
+        return queryset.select_related('image').only(
+            'id', 'nombre', 'apellidos', 'pasos_totales',
+            'image__uuid', 'image__extension', 'image__nombre_logico'
+        ).annotate(
+            leaderboard_position=leaderboard_position_expression()
+        )
 
 # ------------------------------------------------------------------------------
 # FAQ
@@ -0,0 +1,48 @@
+import time
+from django.core.cache import cache
+
+# ==========================================================================
+# CACHE_SERVICE – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Utilidades de caché versionada para respuestas de solo lectura.
+#              Cada grupo de claves depende de una versión; al invalidar se
+#              genera una versión nueva y las entradas anteriores expiran solas.
+# ==========================================================================
+
+CATALOGO_VERSION_KEY = "catalog:version"
+CATALOGO_TIMEOUT = 60 * 10
+
+# El leaderboard cambia con cada sincronización de pasos: se sirve con un TTL corto
+# en lugar de invalidar por cada escritura, y la versión solo cambia al borrar usuarios.
+LEADERBOARD_VERSION_KEY = "leaderboard:version"
+LEADERBOARD_TIMEOUT = 30
+
+# Parámetros de recompensa: cambian solo desde el admin, se invalidan al guardar un Parametro
+RECOMPENSAS_VERSION_KEY = "reward_params:version"
+RECOMPENSAS_TIMEOUT = 60 * 60
+
+# Preguntas frecuentes: contenido prácticamente estático, la versión se usa además como ETag
+FAQ_VERSION_KEY = "faq:version"
+FAQ_TIMEOUT = 60 * 60 * 24
+
+# Extensión de cada imagen por UUID: las filas no cambian una vez creadas,
+# se guardan sin expiración y se borran junto con la imagen
+IMAGEN_KEY_PREFIX = "imagen:"
+
+
+def clave_imagen(uuid):
+    return f"{IMAGEN_KEY_PREFIX}{uuid}"
+
+
+def obtener_version(clave_version):
+    """
+    Devuelve la versión vigente del grupo de claves, creándola si no existe.
+    """
+    return cache.get_or_set(clave_version, time.time_ns, timeout=None)
+
+
+def invalidar_version(clave_version):
+    """
+    Genera una nueva versión para el grupo, dejando obsoletas sus entradas.
+    """
+    cache.set(clave_version, time.time_ns(), timeout=None)
@@ -0,0 +1,148 @@
+import logging
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+# ==========================================================================
+# EMAIL_SERVICE – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Envío de correos fuera del request. Los mensajes se encolan en
+#              un pool de hilos propio, así la latencia del SMTP no bloquea al
+#              worker que atiende la petición.
+# ==========================================================================
+
+logger = logging.getLogger(__name__)
+
+# Pool dedicado al correo: un SMTP lento solo demora otros correos
+_email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="refit-email")
+
+# Cada hilo del pool mantiene abierta su conexión al backend de correo, evitando
+# el handshake TCP + STARTTLS + login por cada mensaje
+_hilo_local = threading.local()
+
+
+def _obtener_conexion():
+    conexion = getattr(_hilo_local, "conexion", None)
+    if conexion is None:
+        conexion = get_connection(fail_silently=False)
+        conexion.open()
+        _hilo_local.conexion = conexion
+    return conexion
+
+
+def _descartar_conexion():
+    conexion = getattr(_hilo_local, "conexion", None)
+    _hilo_local.conexion = None
+    if conexion is not None:
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+
+# Reintentos ante fallas transitorias (desconexión, timeout, respuestas SMTP 4xx),
+# con espera exponencial dentro del hilo del pool: el request ya respondió
+MAX_REINTENTOS = 3
+ESPERA_BASE_SEGUNDOS = 2
+
+
+def _es_falla_transitoria(error):
+    # SMTPException hereda de OSError: primero se descartan los errores SMTP permanentes.
+    # Las respuestas del servidor (incluido SMTPConnectError) se reintentan solo si son 4xx
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        # SMTPRecipientsRefused, SMTPNotSupportedError y demás errores SMTP permanentes
+        return False
+    return isinstance(error, OSError)
+
+
+def _enviar(mensaje):
+    for intento in range(MAX_REINTENTOS + 1):
+        try:
+            mensaje.connection = _obtener_conexion()
+            mensaje.send(fail_silently=False)
+            return
+        except Exception as error:
+            _descartar_conexion()
+            if intento == MAX_REINTENTOS or not _es_falla_transitoria(error):
+                logger.exception("Error al enviar correo a %s", ", ".join(mensaje.to))
+                return
+            # La primera falla suele ser la conexión inactiva cerrada por el servidor: reintento inmediato
+            espera = 0 if intento == 0 else ESPERA_BASE_SEGUNDOS ** intento
+            logger.warning(
+                "Falla transitoria enviando correo a %s (intento %s): %s",
+                ", ".join(mensaje.to), intento + 1, error
+            )
+            time.sleep(espera)
+
+
+def enviar_correo_async(mensaje):
+    """
+    Encola un EmailMessage/EmailMultiAlternatives ya armado y retorna de inmediato.
+    Los errores de envío quedan registrados en el log.
+    """
+    _email_executor.submit(_enviar, mensaje)
+
+
+# --------------------------------------------------------------------------
+# Correo de recuperación de contraseña
+# --------------------------------------------------------------------------
+# Plantillas armadas una sola vez al importar: por mensaje solo se sustituye el enlace
+RECUPERACION_ASUNTO = "Solicitud de restablecimiento de contraseña"
+RECUPERACION_URL = "https://refit.lat/reset-password?token={token}"
+
+RECUPERACION_TEXTO = (
+    "Este es un correo automático generado por ReFit.\n\n"
+    "Para restablecer tu contraseña, usa este enlace:\n{deep_link}\n\n"
+    "Si no solicitaste restablecer tu contraseña, puedes ignorar este mensaje.\n\n"
+    "¡Gracias por confiar en ReFit!"
+).format
+
+RECUPERACION_HTML = """
+<html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.5; color: #333;">
+        <h2>Recuperación de contraseña</h2>
+        <p>Este es un correo automático generado por ReFit.</p>
+        <p>Hemos recibido tu solicitud para restablecer la contraseña de tu cuenta.</p>
+        <p>Para continuar, por favor haz clic en el siguiente botón:</p>
+        <p>
+            <a href="{deep_link}" 
+                style="display: inline-block; padding: 10px 20px; background-color: #4CAF50; color: white; 
+                        text-decoration: none; border-radius: 5px;">
+                Restablecer contraseña
+            </a>
+        </p>
+        <p>Si no solicitaste este cambio, puedes ignorar este mensaje.</p>
+        <p>¡Gracias por confiar en ReFit!</p>
+    </body>
+</html>
+""".format
+
+
+def _enviar_recuperacion(email, recovery_token):
+    """
+    Arma y envía el correo HTML con el deep link de recuperación de contraseña.
+    """
+    deep_link = RECUPERACION_URL.format(token=recovery_token)
+
+    email_message = EmailMultiAlternatives(
+        RECUPERACION_ASUNTO, RECUPERACION_TEXTO(deep_link=deep_link),
+        settings.DEFAULT_FROM_EMAIL, [email]
+    )
+    email_message.attach_alternative(RECUPERACION_HTML(deep_link=deep_link), "text/html")
+    _enviar(email_message)
+
+
+def enviar_recuperacion_async(email, recovery_token):
+    """
+    Encola el correo de recuperación de contraseña; el armado del mensaje
+    también ocurre en el pool, fuera del request.
+    """
+    _email_executor.submit(_enviar_recuperacion, email, recovery_token)
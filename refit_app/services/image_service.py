@@ -0,0 +1,19 @@
+# ==========================================================================
+# IMAGE_SERVICE – ReFit App
+# Idioma: Código en inglés / Comentarios y mensajes en español
+# Descripción: Utilidades para validar las imágenes subidas por los usuarios.
+# ==========================================================================
+
+# Firmas (magic bytes) de los formatos aceptados
+FIRMA_JPEG = b"\xff\xd8\xff"
+FIRMA_PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def es_imagen_permitida(archivo):
+    """
+    Verifica por contenido que el archivo sea JPG o PNG, leyendo solo sus primeros bytes.
+    No confía en la extensión del nombre y deja el archivo posicionado al inicio para guardarlo.
+    """
+    cabecera = archivo.read(len(FIRMA_PNG))
+    archivo.seek(0)
+    return cabecera.startswith(FIRMA_JPEG) or cabecera.startswith(FIRMA_PNG)
@@ -1,4 +1,5 @@
 from datetime import date
+from django.utils import timezone
 from refit_app.models import Pasos, UsuarioObjetivoDiario
 
 # ==========================================================================
@@ -8,48 +9,62 @@ from refit_app.models import Pasos, UsuarioObjetivoDiario
 # Descripción: Archivo donde se encuentran los servicios relacionados con los objetivos diarios.
 # ==========================================================================
 
-def puede_completar_objetivo(usuario_objetivo):
+def objetivos_con_relaciones():
+    """
+    Queryset base de UsuarioObjetivoDiario con el objetivo y el usuario en el mismo JOIN.
+    Las funciones de evaluación de este módulo leen 'fk_objetivos_diarios' de cada tarea,
+    por lo que quienes las llaman deberían partir de este queryset.
+    """
+    return UsuarioObjetivoDiario.objects.select_related("fk_objetivos_diarios", "fk_usuarios")
+
+
+def puede_completar_objetivo(usuario_objetivo, hoy=None):
     """
     Verifica si el usuario ha cumplido con el requisito del objetivo diario.
     Se separan las lógicas cuantitativas y cualitativas.
+    'hoy' permite que quien evalúa varias tareas calcule la fecha una sola vez.
     """
-    objetivo = usuario_objetivo.fk_objetivos_diarios
-    tipo = getattr(objetivo, "tipo", "cuantitativo")  # fallback a cuantitativo
+    # Una tarea ya completada no necesita volver a evaluarse (ni consultar pasos)
+    if usuario_objetivo.fecha_completado is not None:
+        return True
 
-    if tipo == "cuantitativo":
-        return evaluar_objetivo_cuantitativo(usuario_objetivo)
-    
-    elif tipo == "cualitativo":
-        # No se valida directamente, queda para verificación externa
-        return evaluar_objetivo_cualitativo(usuario_objetivo)
+    # 'tipo' es NOT NULL con valor por defecto 'cuantitativo' (también en la base)
+    objetivo = usuario_objetivo.fk_objetivos_diarios
 
-    return False  # Tipo desconocido
+    # Evaluador según el tipo (ver EVALUADORES_POR_TIPO); tipo desconocido -> False
+    evaluador = EVALUADORES_POR_TIPO.get(objetivo.tipo, _no_completable)
+    return evaluador(usuario_objetivo, hoy)
 
 # --------------------------------------------------------------------------
 # CUANTITATIVOS
 # --------------------------------------------------------------------------
-def evaluar_objetivo_cuantitativo(usuario_objetivo):
+def evaluar_objetivo_cuantitativo(usuario_objetivo, hoy=None):
     """
     Evalúa si el usuario ha cumplido un objetivo cuantitativo (ej. pasos).
     """
     objetivo = usuario_objetivo.fk_objetivos_diarios
-    usuario = usuario_objetivo.fk_usuarios
-
-    if objetivo.requisito == "pasos":
-        pasos_hoy = Pasos.objects.filter(fk_usuarios=usuario, fecha=date.today()).first()
-        return pasos_hoy and pasos_hoy.pasos >= objetivo.valor_requerido
+    evaluador = EVALUADORES_CUANTITATIVOS.get(objetivo.requisito, _no_completable)
+    return evaluador(usuario_objetivo, hoy)
 
-    # Podés agregar aquí otros tipos cuantitativos si se extiende el sistema
-    # elif objetivo.requisito == "km":
-    #     return distancia_hoy >= objetivo.valor_requerido
 
-    return False
+def evaluar_requisito_pasos(usuario_objetivo, hoy=None):
+    """
+    Requisito 'pasos': los pasos del día alcanzan el valor requerido del objetivo.
+    """
+    objetivo = usuario_objetivo.fk_objetivos_diarios
+    # Consulta booleana: se filtra por el id ya cargado en la tarea y por el umbral,
+    # sin instanciar el registro de Pasos ni resolver la relación con el usuario
+    return Pasos.objects.filter(
+        fk_usuarios_id=usuario_objetivo.fk_usuarios_id,
+        fecha=hoy or date.today(),
+        pasos__gte=objetivo.valor_requerido
+    ).exists()
 
 
 # --------------------------------------------------------------------------
 # CUALITATIVOS
 # --------------------------------------------------------------------------
-def evaluar_objetivo_cualitativo(usuario_objetivo):
+def evaluar_objetivo_cualitativo(usuario_objetivo, hoy=None):
     """
     Evalúa un objetivo cualitativo (requiere que otro módulo confirme que se cumplió).
     Siempre devuelve False por defecto. El cumplimiento lo marca otro sistema.
@@ -57,15 +72,35 @@ def evaluar_objetivo_cualitativo(usuario_objetivo):
     return False
 
 
-def marcar_objetivo_cualitativo_como_completado(user, codigo_requisito):
+def _no_completable(usuario_objetivo, hoy=None):
+    return False
+
+# --------------------------------------------------------------------------
+# Registro de evaluadores
+# --------------------------------------------------------------------------
+# Para extender el sistema alcanza con registrar la función, por ejemplo:
+#     EVALUADORES_CUANTITATIVOS["km"] = evaluar_requisito_km
+EVALUADORES_CUANTITATIVOS = {
+    "pasos": evaluar_requisito_pasos,
+}
+
+EVALUADORES_POR_TIPO = {
+    "cuantitativo": evaluar_objetivo_cuantitativo,
+    "cualitativo": evaluar_objetivo_cualitativo,  # Queda para verificación externa
+}
+
+
+def marcar_objetivo_cualitativo_como_completado(user, codigo_requisito, hoy=None):
     """
     Marca como completado el objetivo cualitativo del día que coincide con el requisito.
 
     Uso:
         marcar_objetivo_cualitativo_como_completado(user, "login")
         marcar_objetivo_cualitativo_como_completado(user, "foto_perfil")
+
+    Devuelve la cantidad de tareas marcadas. 'hoy' permite reutilizar la fecha del request.
     """
-    hoy = date.today()
+    hoy = hoy or date.today()
     tareas = UsuarioObjetivoDiario.objects.filter(
         fk_usuarios=user,
         fecha_creacion=hoy,
@@ -74,6 +109,5 @@ def marcar_objetivo_cualitativo_como_completado(user, codigo_requisito):
         fecha_completado__isnull=True
     )
 
-    for tarea in tareas:
-        tarea.fecha_completado = date.today()
-        tarea.save()
\ No newline at end of file
+    # Un único UPDATE para todas las tareas pendientes (no hay señales sobre UsuarioObjetivoDiario)
+    return tareas.update(fecha_completado=timezone.now())
\ No newline at end of file
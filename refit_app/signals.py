@@ -1,6 +1,12 @@
-from django.db.models.signals import post_save
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.core.cache import cache
 from django.dispatch import receiver
-from .models import Usuario, Canje
+from .models import User, Canje, Producto, Categoria, ProductoCategoria, ProductoImagen, Parametro, Imagen, FAQ
+from .services.cache_service import (
+    CATALOGO_VERSION_KEY, FAQ_VERSION_KEY, LEADERBOARD_VERSION_KEY, RECOMPENSAS_VERSION_KEY,
+    clave_imagen, invalidar_version
+)
 
 # ==========================================================================
 # SIGNALS – ReFit App
@@ -10,14 +16,65 @@ from .models import Usuario, Canje
 #              de las acciones realizadas por los usuarios en la aplicación.
 # ==========================================================================
 
+audit_logger = logging.getLogger("refit.audit")
+
 # Auditoría de creación de usuario
-@receiver(post_save, sender=Usuario)
+@receiver(post_save, sender=User)
 def log_usuario_creado(sender, instance, created, **kwargs):
     if created:
-        print(f"[AUDITORÍA] Usuario creado: {instance.email}")
+        audit_logger.info("Usuario creado: %s", instance.email)
 
-# Aquí puedes agregar más lógica para registrar la acción en un archivo o base de datos
+# Auditoría de canjes: se registran los ids ya cargados en la instancia,
+# sin consultar el producto en cada canje
 @receiver(post_save, sender=Canje)
 def log_canje_creado(sender, instance, created, **kwargs):
     if created:
-        print(f"[AUDITORÍA] Producto canjeado: {instance.fk_productos.nombre}")
+        audit_logger.info(
+            "Producto canjeado: producto=%s usuario=%s monto=%s",
+            instance.fk_productos_id, instance.fk_usuarios_id, instance.monto
+        )
+
+# --------------------------------------------------------------------------
+# Invalidación de caché del catálogo de productos
+# --------------------------------------------------------------------------
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=ProductoCategoria)
+@receiver(post_delete, sender=ProductoCategoria)
+@receiver(post_save, sender=ProductoImagen)
+@receiver(post_delete, sender=ProductoImagen)
+def invalidar_cache_catalogo(sender, **kwargs):
+    invalidar_version(CATALOGO_VERSION_KEY)
+
+# --------------------------------------------------------------------------
+# Invalidación de caché del leaderboard
+# --------------------------------------------------------------------------
+@receiver(post_delete, sender=User)
+def invalidar_cache_leaderboard(sender, **kwargs):
+    invalidar_version(LEADERBOARD_VERSION_KEY)
+
+# --------------------------------------------------------------------------
+# Invalidación de caché de parámetros de recompensa
+# --------------------------------------------------------------------------
+@receiver(post_save, sender=Parametro)
+@receiver(post_delete, sender=Parametro)
+def invalidar_cache_recompensas(sender, **kwargs):
+    invalidar_version(RECOMPENSAS_VERSION_KEY)
+
+# --------------------------------------------------------------------------
+# Invalidación de caché de preguntas frecuentes
+# --------------------------------------------------------------------------
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def invalidar_cache_faq(sender, **kwargs):
+    invalidar_version(FAQ_VERSION_KEY)
+
+# --------------------------------------------------------------------------
+# Invalidación de la extensión cacheada por UUID de imagen
+# --------------------------------------------------------------------------
+@receiver(post_save, sender=Imagen)
+@receiver(post_delete, sender=Imagen)
+def invalidar_cache_imagen(sender, instance, **kwargs):
+    cache.delete(clave_imagen(instance.uuid))
@@ -2,26 +2,29 @@ import uuid
 import os
 import logging
 from django.conf import settings
-from django.http import FileResponse, Http404
-import mimetypes
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.core.files.base import ContentFile
-from rest_framework.response import Response
 from django.core.files.storage import default_storage
-from datetime import datetime
+from django.core.cache import cache
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
+from datetime import date
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
 from refit_app.models import User, Parametro, Pasos, Canje, Imagen, FAQ
 from refit_app.serializers import (
     ReferredUserSerializer,
     RecompensaParametroSerializer,
-    HistoricalStepsSerializer,
     HistoricalCanjeSerializer,
-    ImagenSerializer,
     FAQSerializer
 )
+from refit_app.services.cache_service import (
+    FAQ_TIMEOUT, FAQ_VERSION_KEY, RECOMPENSAS_TIMEOUT, RECOMPENSAS_VERSION_KEY,
+    clave_imagen, obtener_version
+)
+from refit_app.services.image_service import es_imagen_permitida
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +47,9 @@ class ReferredUsersView(APIView):
         """
         Devuelve los usuarios referidos por el usuario autenticado.
         """
-        referidos = User.objects.filter(fk_usuario_referente=request.user)
+        referidos = ReferredUserSerializer.setup_eager_loading(
+            User.objects.filter(fk_usuario_referente=request.user)
+        )
         data = ReferredUserSerializer(referidos, many=True).data
         logger.info("User %s requested referred users.", request.user.email)
         return Response(data, status=HTTP_200_OK)
@@ -55,16 +60,20 @@ class ReferredUsersView(APIView):
         if not referral_code:
             return Response({"error": "Debe enviar el código del referente."}, status=HTTP_400_BAD_REQUEST)
 
-        if request.user.fk_usuario_referente is not None:
+        if request.user.fk_usuario_referente_id is not None:
             return Response({"error": "Ya tiene un usuario referente asignado."}, status=HTTP_400_BAD_REQUEST)
 
         try:
-            referente = User.objects.get(codigo_referido=referral_code, is_active=True)
+            referente = User.objects.only('id', 'email').get(codigo_referido=referral_code, is_active=True)
         except User.DoesNotExist:
             return Response({"error": "El código de referido no es válido."}, status=HTTP_400_BAD_REQUEST)
 
-        request.user.fk_usuario_referente = referente
-        request.user.save()
+        # UPDATE condicional: si otra petición asignó un referente entretanto, no se sobrescribe
+        asignado = User.objects.filter(
+            pk=request.user.pk, fk_usuario_referente__isnull=True
+        ).update(fk_usuario_referente=referente)
+        if not asignado:
+            return Response({"error": "Ya tiene un usuario referente asignado."}, status=HTTP_400_BAD_REQUEST)
 
         logger.info("Usuario %s asignó como referente a %s", request.user.email, referente.email)
         return Response({"message": "Usuario referente asignado correctamente."}, status=HTTP_200_OK)
@@ -82,8 +91,12 @@ class RecompensasParametrosView(APIView):
         """
         Devuelve los parámetros de recompensa.
         """
-        parametros = Parametro.objects.filter(codigo__startswith="RECOMPENSA_")
-        data = RecompensaParametroSerializer(parametros, many=True).data
+        cache_key = f"reward_params:{obtener_version(RECOMPENSAS_VERSION_KEY)}"
+        data = cache.get(cache_key)
+        if data is None:
+            parametros = Parametro.objects.filter(codigo__startswith="RECOMPENSA_").only('codigo', 'valor')
+            data = RecompensaParametroSerializer(parametros, many=True).data
+            cache.set(cache_key, data, RECOMPENSAS_TIMEOUT)
         logger.info("User %s requested reward parameters.", request.user.email)
         return Response(data, status=HTTP_200_OK)
 
@@ -93,8 +106,11 @@ class RecompensasParametrosView(APIView):
 class HistoricalStepsView(APIView):
     """
     Devuelve el historial de pasos del usuario autenticado.
+    Si se envía ?limit= (y opcionalmente ?offset=) la respuesta se pagina; sin esos
+    parámetros se mantiene la lista completa del rango, como hasta ahora.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = LimitOffsetPagination
 
     def get(self, request):
         """
@@ -106,12 +122,14 @@ class HistoricalStepsView(APIView):
 
         # Sin fechas -> solo los pasos de hoy
         if not start_date_str or not end_date_str:
-            today = datetime.now().date()
-            steps = Pasos.objects.filter(fk_usuarios=user, fecha=today).order_by('-fecha')
+            steps = Pasos.objects.filter(fk_usuarios=user, fecha=date.today())
         else:
             try:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+                # fromisoformat acepta también otras variantes ISO: el largo fija YYYY-MM-DD
+                if len(start_date_str) != 10 or len(end_date_str) != 10:
+                    raise ValueError
+                start_date = date.fromisoformat(start_date_str)
+                end_date = date.fromisoformat(end_date_str)
             except ValueError:
                 return Response(
                     {"error": "Formato inválido. Use YYYY-MM-DD para startDate y endDate."},
@@ -121,11 +139,21 @@ class HistoricalStepsView(APIView):
             steps = Pasos.objects.filter(
                 fk_usuarios=user,
                 fecha__range=(start_date, end_date)
-            ).order_by('-fecha')
+            )
 
-        data = HistoricalStepsSerializer(steps, many=True).data
+        # Respuesta de solo lectura: se evita instanciar modelos y serializadores por fila.
+        # El orden por fecha recorre el índice único (fk_usuarios, fecha) de PASOS.
+        steps = steps.order_by('-fecha').values('fecha', 'pasos')
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(steps, request, view=self)
+        # Sin paginar, iterator() recorre el cursor por bloques sin llenar la caché del queryset
+        rows = steps.iterator(chunk_size=500) if page is None else page
+        data = [{"date": row['fecha'], "steps": row['pasos']} for row in rows]
 
         logger.info("User %s requested historical steps.", user.email)
+        if page is not None:
+            return paginator.get_paginated_response(data)
         return Response(data, status=HTTP_200_OK)
 
 # ----------------------------------------------------------------------------
@@ -141,8 +169,10 @@ class HistoricalCanjesView(APIView):
         """
         Devuelve el historial de canjes del usuario autenticado.
         """
-        canjes = Canje.objects.filter(fk_usuarios=request.user).order_by('-fecha')
-        data = HistoricalCanjeSerializer(canjes, many=True).data
+        canjes = HistoricalCanjeSerializer.setup_eager_loading(
+            Canje.objects.filter(fk_usuarios=request.user).order_by('-fecha')
+        )
+        data = HistoricalCanjeSerializer(canjes.iterator(chunk_size=500), many=True).data
         logger.info("User %s requested historical redemptions.", request.user.email)
         return Response(data, status=HTTP_200_OK)
     
@@ -162,13 +192,13 @@ class UploadImageView(APIView):
             return Response({"error": "No se ha enviado ningún archivo."}, status=HTTP_400_BAD_REQUEST)
 
         ext = os.path.splitext(archivo.name)[-1].lower()
-        if ext not in ['.jpg', '.jpeg', '.png']:
+        if ext not in ['.jpg', '.jpeg', '.png'] or not es_imagen_permitida(archivo):
             return Response({"error": "Formato no permitido. Solo JPG o PNG."}, status=HTTP_400_BAD_REQUEST)
 
-        img_uuid = str(uuid.uuid4())
+        img_uuid = uuid.uuid4().hex
         filename = f"{request.user.id}_profilepicture{ext}"
         ruta_publica = os.path.join("public", filename)
-        default_storage.save(ruta_publica, ContentFile(archivo.read()))
+        default_storage.save(ruta_publica, archivo)  # Storage.save escribe por chunks, sin cargar el archivo en memoria
 
         imagen = Imagen.objects.create(uuid=img_uuid, extension=ext)
 
@@ -190,15 +220,25 @@ class ServeImageView(APIView):
         """
         Busca una imagen por UUID y devuelve su URL pública completa.
         """
-        try:
-            imagen = Imagen.objects.get(uuid=filename)
-        except Imagen.DoesNotExist:
-            return Response({"error": "Imagen no encontrada."}, status=HTTP_404_NOT_FOUND)
+        clave = clave_imagen(filename)
+        extension = cache.get(clave)
+        if extension is None:
+            try:
+                extension = Imagen.objects.values_list('extension', flat=True).get(uuid=filename)
+            except Imagen.DoesNotExist:
+                return Response({"error": "Imagen no encontrada."}, status=HTTP_404_NOT_FOUND)
+            cache.set(clave, extension, timeout=None)
 
-        public_url = f"http://3.17.152.152/media/public/{imagen.uuid}.{imagen.extension.strip('.')}"
+        # Los bytes de la imagen los sirve el CDN/nginx (MEDIA_CDN_URL, obligatorio fuera de DEBUG).
+        # En desarrollo la URL de MEDIA_URL se completa con el host del request: siempre absoluta
+        ruta = f"public/{filename}.{extension.strip('.')}"
+        if settings.MEDIA_CDN_URL:
+            public_url = f"{settings.MEDIA_CDN_URL}{ruta}"
+        else:
+            public_url = request.build_absolute_uri(f"{settings.MEDIA_URL}{ruta}")
 
         return Response({
-            "uuid": imagen.uuid,
+            "uuid": filename,
             "url": public_url
         }, status=HTTP_200_OK)
     
@@ -211,7 +251,13 @@ class FAQListView(APIView):
     """
     permission_classes = [AllowAny]
 
+    # La versión de caché de FAQs sirve de ETag: si el cliente ya la tiene se responde 304 sin cuerpo
+    @method_decorator(etag(lambda request: str(obtener_version(FAQ_VERSION_KEY))))
     def get(self, request):
-        faqs = FAQ.objects.all().order_by('id')
-        serializer = FAQSerializer(faqs, many=True)
-        return Response(serializer.data, status=HTTP_200_OK)
+        cache_key = f"faq:{obtener_version(FAQ_VERSION_KEY)}"
+        data = cache.get(cache_key)
+        if data is None:
+            faqs = FAQ.objects.only('id', 'question', 'answer').order_by('id')
+            data = FAQSerializer(faqs, many=True).data
+            cache.set(cache_key, data, FAQ_TIMEOUT)
+        return Response(data, status=HTTP_200_OK)
@@ -1,31 +1,39 @@
+import hmac
 import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.throttling import BaseThrottle
 from rest_framework.status import (
-    HTTP_200_OK, HTTP_201_CREATED,
-    HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND, HTTP_429_TOO_MANY_REQUESTS
 )
-from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
 import uuid
-from datetime import timedelta, date
-from django.core.mail import EmailMultiAlternatives
+from datetime import timedelta
 
-from refit_app.models import User, PasswordRecovery
+from refit_app.models import User, PasswordRecovery, vencimiento_recuperacion
 from refit_app.serializers import (
     UserRegisterSerializer,
     LoginResponseSerializer,
-    ChangePasswordSerializer,
-    QualitativeObjectiveSerializer
+    ChangePasswordSerializer
 )
+from refit_app.backends import EmailModelBackend
+from refit_app.services.email_service import enviar_recuperacion_async
+from refit_app.services.objetivos_service import marcar_objetivo_cualitativo_como_completado
 
-from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 
-User = get_user_model()
+# Único backend configurado: LoginView lo invoca directo, sin el recorrido de authenticate()
+_auth_backend = EmailModelBackend()
+
+# Resuelve la IP del cliente igual que los throttles de DRF (respeta NUM_PROXIES)
+_identificador_cliente = BaseThrottle()
 
 logger = logging.getLogger(__name__)
 
@@ -64,13 +72,21 @@ class RegisterView(APIView):
 # --------------------------------------------------------------------------
 # Inicio de sesión
 # --------------------------------------------------------------------------
+# Las respuestas de autenticación llevan tokens o confirman cambios de credenciales:
+# never_cache agrega Cache-Control: no-store para que ningún intermediario las guarde
+@method_decorator(never_cache, name='dispatch')
 class LoginView(APIView):
     """
     Permite a un usuario autenticarse mediante email y contraseña.
     Actualiza 'first_login', 'ultimo_login' y 'lastlogin' con la fecha actual.
     Retorna la información del usuario en formato LoginResponseSerializer.
+    Tras varios intentos fallidos para un mismo email desde una IP se rechaza el login sin
+    verificar la contraseña hasta que vence la ventana.
     """
     permission_classes = [AllowAny]
+    max_intentos_fallidos = 5
+    ventana_intentos = 60 * 5
+    intervalo_last_login = timedelta(seconds=60)
 
     def post(self, request):
         """
@@ -79,46 +95,75 @@ class LoginView(APIView):
         """
         email = request.data.get("email")
         password = request.data.get("password")
-        user = authenticate(email=email, password=password)
+
+        # Sin email válido no se consulta ni se incrementa el contador de intentos
+        if not isinstance(email, str) or not email.strip() or not isinstance(password, str):
+            return Response({"detail": "Email y contraseña son requeridos."}, status=HTTP_400_BAD_REQUEST)
+
+        # El contador es por email + IP del cliente: desde otra IP no se puede
+        # bloquear el login de la cuenta de un tercero
+        clave_intentos = f"authfail:{email.strip().lower()}:{_identificador_cliente.get_ident(request)}"
+        if cache.get(clave_intentos, 0) >= self.max_intentos_fallidos:
+            logger.warning("Login bloqueado temporalmente por intentos fallidos: %s", email)
+            return Response(
+                {"detail": "Demasiados intentos fallidos. Intente nuevamente más tarde."},
+                status=HTTP_429_TOO_MANY_REQUESTS
+            )
+
+        user = _auth_backend.authenticate(request, username=email, password=password)
 
         if user:
+            cache.delete(clave_intentos)
+
+            # Columnas del usuario a persistir al final del login
+            campos_actualizados = ['last_login']
+
             # Validación de bloqueos y reactivación automática
             if not user.is_active:
                 return Response({"detail": "Cuenta desactivada permanentemente."}, status=HTTP_401_UNAUTHORIZED)
 
             if user.blocked:
-                if user.lock_date and timezone.now() - user.lock_date < timedelta(days=30):
-                    user.blocked = False
-                    user.lock_date = None
-                    logger.info("Usuario %s reactivado durante el período de gracia.", user.email)
-                else:
-                    user.is_active = False
-                    user.save()
-                    logger.warning("Usuario %s intentó iniciar sesión tras el plazo de 30 días.", user.email)
-                    return Response({"detail": "Cuenta eliminada permanentemente."}, status=HTTP_401_UNAUTHORIZED)
+                # Se decide sobre la fila bloqueada (SELECT ... FOR UPDATE) y se escribe en el
+                # momento: un login o una baja concurrentes no pueden pisar este cambio
+                with transaction.atomic():
+                    estado = User.objects.select_for_update().only(
+                        'blocked', 'lock_date', 'is_active'
+                    ).get(pk=user.pk)
+
+                    if not estado.is_active:
+                        return Response({"detail": "Cuenta desactivada permanentemente."}, status=HTTP_401_UNAUTHORIZED)
+
+                    if estado.blocked:
+                        if estado.lock_date and timezone.now() - estado.lock_date < timedelta(days=30):
+                            estado.blocked = False
+                            estado.lock_date = None
+                            estado.save(update_fields=['blocked', 'lock_date'])
+                            logger.info("Usuario %s reactivado durante el período de gracia.", user.email)
+                        else:
+                            estado.is_active = False
+                            estado.save(update_fields=['is_active'])
+                            logger.warning("Usuario %s intentó iniciar sesión tras el plazo de 30 días.", user.email)
+                            return Response({"detail": "Cuenta eliminada permanentemente."}, status=HTTP_401_UNAUTHORIZED)
+
+                user.blocked = estado.blocked
+                user.lock_date = estado.lock_date
 
             es_primer_login = user.first_login  # Captura el estado actual
 
             # Genera tokens de acceso y actualización
             tokens = RefreshToken.for_user(user)
 
-            # Serializar datos del usuario
-            serializer = LoginResponseSerializer(user, context={'request': request})
+            # Serializar datos del usuario (una sola consulta con los datos calculados)
+            usuario_respuesta = LoginResponseSerializer.setup_eager_loading(User.objects.filter(pk=user.pk)).get()
+            serializer = LoginResponseSerializer(usuario_respuesta, context={'request': request})
             data = serializer.data
 
             data["accessToken"] = str(tokens.access_token)
             data["refreshToken"] = str(tokens)
 
-            # Intentar marcar objetivo cualitativo como completado
+            # Marcar objetivo cualitativo 'login' del día (un único UPDATE, sin cargar las tareas)
             try:
-                serializer = QualitativeObjectiveSerializer(
-                    data={"requisito": "login"},
-                    context={"request": request}
-                )
-                if serializer.is_valid():
-                    for tarea in serializer.tareas_qualitativas:
-                        tarea.fecha_completado = date.today()
-                        tarea.save()
+                if marcar_objetivo_cualitativo_como_completado(user, "login"):
                     logger.info("Objetivo cualitativo 'login' completado para %s", user.email)
             except Exception as e:
                 logger.warning("No se pudo completar objetivo cualitativo: %s", e)
@@ -126,24 +171,42 @@ class LoginView(APIView):
             # Luego de generar la respuesta, actualizamos
             if es_primer_login:
                 user.first_login = False
+                campos_actualizados.append('first_login')
 
-            user.last_login = timezone.now()
-            user.save()
+            # Un re-login dentro del minuto no vuelve a escribir last_login
+            ahora = timezone.now()
+            if user.last_login is None or ahora - user.last_login > self.intervalo_last_login:
+                user.last_login = ahora
+            else:
+                campos_actualizados.remove('last_login')
+
+            if campos_actualizados:
+                user.save(update_fields=campos_actualizados)
 
             logger.info("Usuario autenticado: %s", user.email)
             return Response(data, status=HTTP_200_OK)
         
+        # El contador vence con la ventana contada desde el primer fallo
+        if not cache.add(clave_intentos, 1, self.ventana_intentos):
+            try:
+                cache.incr(clave_intentos)
+            except ValueError:  # la clave venció entre add() e incr()
+                cache.set(clave_intentos, 1, self.ventana_intentos)
+
         logger.warning("Credenciales inválidas para el email: %s", email)
         return Response({"detail": "Credenciales inválidas."}, status=HTTP_401_UNAUTHORIZED)
 
 # --------------------------------------------------------------------------
 # Cierre de Sesión
 # --------------------------------------------------------------------------
+@method_decorator(never_cache, name='dispatch')
 class LogOutView(APIView):
     """
     Cierra la sesión del usuario autenticado.
     Nota: Con JWT, la invalidación de tokens se gestiona mediante mecanismos adicionales.
+    Solo se valida el token (sin consultar USUARIOS): request.user es un TokenUser.
     """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -151,12 +214,13 @@ class LogOutView(APIView):
         Cierra la sesión del usuario autenticado.
         En el caso de JWT, se recomienda invalidar el token en el cliente.
         """
-        logger.info("Cierre de sesión solicitado por: %s", request.user.email)
+        logger.info("Cierre de sesión solicitado por el usuario %s", request.user.id)
         return Response({"message": "Sesión cerrada con éxito."}, status=HTTP_200_OK)
 
 # --------------------------------------------------------------------------
 # Cambiar contraseña
 # --------------------------------------------------------------------------
+@method_decorator(never_cache, name='dispatch')
 class ChangePasswordView(APIView):
     """
     Permite a un usuario autenticado cambiar su contraseña.
@@ -169,26 +233,27 @@ class ChangePasswordView(APIView):
         Cambia la contraseña del usuario autenticado.
         Valida la contraseña actual y establece la nueva contraseña.
         """
+        user = request.user
         serializer = ChangePasswordSerializer(data=request.data)
         if serializer.is_valid():
-            oldPassword = serializer.validated_data['oldPassword']
-            newPassword = serializer.validated_data['newPassword']
+            datos = serializer.validated_data
 
-            if not request.user.check_password(oldPassword ):
-                logger.warning("Intento fallido de cambio de contraseña para: %s", request.user.email)
+            if not user.check_password(datos['oldPassword']):
+                logger.warning("Intento fallido de cambio de contraseña para: %s", user.email)
                 return Response({"detail": "Contraseña actual incorrecta"}, status=HTTP_400_BAD_REQUEST)
 
-            request.user.set_password(newPassword)
-            request.user.update_password = False
-            request.user.save()
-            logger.info("Contraseña actualizada para el usuario: %s", request.user.email)
+            user.set_password(datos['newPassword'])
+            user.update_password = False
+            user.save(update_fields=['password', 'update_password'])
+            logger.info("Contraseña actualizada para el usuario: %s", user.email)
             return Response({"detail": "Contraseña actualizada exitosamente"}, status=HTTP_200_OK)
-        logger.error("Error al cambiar contraseña para el usuario %s: %s", request.user.email, serializer.errors)
+        logger.error("Error al cambiar contraseña para el usuario %s: %s", user.email, serializer.errors)
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 # --------------------------------------------------------------------------
 # Recuperar Contraseña 
 # --------------------------------------------------------------------------
+@method_decorator(never_cache, name='dispatch')
 class PasswordRecoveryView(APIView):
     """
     View para recuperación de contraseña:
@@ -202,82 +267,63 @@ class PasswordRecoveryView(APIView):
         new_password = request.data.get("newPassword")
         token = request.data.get("token")
 
+        # Valores que no son texto (números, listas, objetos JSON) se rechazan antes de consultar
+        if any(v is not None and not isinstance(v, str) for v in (email, new_password, token)):
+            return Response({"error": "Parámetros inválidos."}, status=HTTP_400_BAD_REQUEST)
+
         # Recuperar contraseña: generación de deep link
         if email and not new_password and not token:
             try:
-                user = User.objects.get(email=email, is_active=True)
-            except User.DoesNotExist:
+                user = User.objects.only('id').get(email__iexact=email, is_active=True)
+            except (User.DoesNotExist, User.MultipleObjectsReturned):
+                # Emails duplicados por mayúsculas (ver el comando emails_duplicados): igual que en
+                # EmailModelBackend, no hay un único usuario al que enviar el enlace
                 return Response({"error": "Usuario no encontrado o cuenta inactiva."}, status=HTTP_404_NOT_FOUND)
 
+            # Upsert sobre la fila del usuario (INSERT ... ON CONFLICT DO UPDATE): una sola
+            # sentencia, sin carrera entre dos solicitudes simultáneas del mismo usuario
             recovery_token = uuid.uuid4().hex
-            PasswordRecovery.objects.filter(user=user).delete()
-            PasswordRecovery.objects.create(user=user, token=recovery_token)
-
-            # Generar deep link
-            deep_link = f"https://refit.lat/reset-password?token={recovery_token}"
-
-            # Preparar el mail HTML
-            subject = "Solicitud de restablecimiento de contraseña"
-            from_email = settings.DEFAULT_FROM_EMAIL
-            recipient_list = [email]
-
-            text_content = (
-                f"Este es un correo automático generado por ReFit.\n\n"
-                f"Para restablecer tu contraseña, usa este enlace:\n{deep_link}\n\n"
-                f"Si no solicitaste restablecer tu contraseña, puedes ignorar este mensaje.\n\n"
-                f"¡Gracias por confiar en ReFit!"
+            PasswordRecovery.objects.bulk_create(
+                [PasswordRecovery(
+                    user=user, token=PasswordRecovery.hash_token(recovery_token),
+                    expires_at=vencimiento_recuperacion(), used=False
+                )],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['token', 'created_at', 'expires_at', 'used'],
             )
 
-            html_content = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.5; color: #333;">
-                    <h2>Recuperación de contraseña</h2>
-                    <p>Este es un correo automático generado por ReFit.</p>
-                    <p>Hemos recibido tu solicitud para restablecer la contraseña de tu cuenta.</p>
-                    <p>Para continuar, por favor haz clic en el siguiente botón:</p>
-                    <p>
-                        <a href="{deep_link}" 
-                            style="display: inline-block; padding: 10px 20px; background-color: #4CAF50; color: white; 
-                                    text-decoration: none; border-radius: 5px;">
-                            Restablecer contraseña
-                        </a>
-                    </p>
-                    <p>Si no solicitaste este cambio, puedes ignorar este mensaje.</p>
-                    <p>¡Gracias por confiar en ReFit!</p>
-                </body>
-            </html>
-            """
-
-            # Enviar email
-            email_message = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-            email_message.attach_alternative(html_content, "text/html")
-            email_message.send(fail_silently=False)
-
-            logger.info("Deep link de recuperación enviado por correo HTML a %s", email)
+            # El correo se arma y envía en segundo plano: el token ya quedó guardado
+            enviar_recuperacion_async(email, recovery_token)
+
+            logger.info("Deep link de recuperación encolado por correo HTML a %s", email)
             return Response(status=HTTP_200_OK)
 
         # Resetear contraseña usando token
         elif email and new_password and token:
-            try:
-                recovery = PasswordRecovery.objects.get(token=token)
-            except PasswordRecovery.DoesNotExist:
+            # Se busca la solicitud vigente por email y el token se compara en tiempo constante:
+            # la consulta no depende del token recibido, así no revela cuáles existen.
+            # password_recovery_user_uniq garantiza a lo sumo una fila por usuario: no hace falta ordenar
+            recovery = (
+                PasswordRecovery.objects.select_related('user')
+                .only('token', 'user', 'user__password', 'user__update_password')
+                .filter(user__email__iexact=email.strip(), expires_at__gt=timezone.now())
+                .first()
+            )
+            token_esperado = recovery.token if recovery else PasswordRecovery.hash_token(uuid.uuid4().hex)
+            token_recibido = PasswordRecovery.hash_token(token.replace('-', '').lower())
+            token_valido = hmac.compare_digest(token_esperado.encode(), token_recibido.encode())
+            if recovery is None or not token_valido:
                 return Response({"error": "Token inválido o expirado."}, status=HTTP_400_BAD_REQUEST)
 
-            if timezone.now() > (recovery.created_at + timedelta(minutes=60)):
-                recovery.delete()
-                return Response({"error": "El token ha expirado."}, status=HTTP_400_BAD_REQUEST)
-
             user = recovery.user
 
-            if user.email != email:
-                return Response({"error": "Email no coincide con el token."}, status=HTTP_400_BAD_REQUEST)
-
             if len(new_password) < 8:
                 return Response({"error": "La nueva contraseña debe tener al menos 8 caracteres."}, status=HTTP_400_BAD_REQUEST)
 
             user.set_password(new_password)
             user.update_password = False
-            user.save()
+            user.save(update_fields=['password', 'update_password'])
 
             recovery.delete()
 
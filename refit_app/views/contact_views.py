@@ -1,13 +1,13 @@
 import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.conf import settings
 from rest_framework.permissions import IsAuthenticated
 
 from refit_app.serializers import ContactUsSerializer
+from refit_app.services.email_service import enviar_correo_async
 
 logger = logging.getLogger(__name__)
 
@@ -51,13 +51,12 @@ class ContactUsView(APIView):
                 f"Email: {email}\n"
                 f"Mensaje:\n{serializer.validated_data['message']}"
             )
-            send_mail(
+            enviar_correo_async(EmailMessage(
                 subject=support_subject,
-                message=support_message,
+                body=support_message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.SUPPORT_EMAIL],
-                fail_silently=False,
-            )
+                to=[settings.SUPPORT_EMAIL],
+            ))
 
             # Mensaje de confirmación al usuario
             user_subject = "¡Gracias por contactarte con ReFit!"
@@ -66,13 +65,12 @@ class ContactUsView(APIView):
                 "El equipo de ReFit leerá tu consulta y nos pondremos en contacto contigo a la brevedad posible.\n\n"
                 "¡Gracias por confiar en nosotros!"
             )
-            send_mail(
+            enviar_correo_async(EmailMessage(
                 subject=user_subject,
-                message=user_message,
+                body=user_message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
-            )
+                to=[email],
+            ))
 
             return Response({"message": "Mensaje enviado con éxito."}, status=HTTP_200_OK)
 
@@ -4,14 +4,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_201_CREATED
 from django.shortcuts import get_object_or_404
-from django.core.files.base import ContentFile
 import uuid
 import os
 from django.core.files.storage import default_storage
-from django.conf import settings
+from django.db.models import Prefetch
+from django.core.cache import cache
+import hashlib
 
 from refit_app.models import Producto, Categoria, ProductoCategoria, Canje, Imagen, ProductoImagen
 from refit_app.serializers import ProductSerializer, CategoriaSerializer
+from refit_app.services.cache_service import CATALOGO_VERSION_KEY, CATALOGO_TIMEOUT, obtener_version
+from refit_app.services.image_service import es_imagen_permitida
 
 logger = logging.getLogger(__name__)
 
@@ -122,6 +125,13 @@ class ProductView(APIView):
         category = request.query_params.get('category')
         featured = request.query_params.get('featured', 'false')  # Asume 'false' si no lo mandan
 
+        # El catálogo cambia poco: se cachea la respuesta por combinación de filtros
+        filtros = hashlib.md5(f"{name}|{category}|{featured.lower()}".encode()).hexdigest()
+        cache_key = f"catalog:{obtener_version(CATALOGO_VERSION_KEY)}:{filtros}"
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data, status=HTTP_200_OK)
+
         productos = Producto.objects.filter(disponible=True).order_by('-fecha_creacion')
 
         if name:
@@ -136,9 +146,22 @@ class ProductView(APIView):
             productos = productos.filter(destacado=True)
         # Si featured no está o no es true, no filtramos por destacado (devolvemos todos)
 
-        productos = productos.distinct()
+        productos = productos.distinct().select_related('imagen_destacada').prefetch_related(
+            Prefetch(
+                'categorias_relacionadas',
+                queryset=ProductoCategoria.objects.select_related('fk_categorias').order_by('pk_productos_categorias'),
+                to_attr='categorias_prefetch'
+            ),
+            # Solo la primera imagen de cada producto (prefetch con slicing)
+            Prefetch(
+                'imagenes',
+                queryset=ProductoImagen.objects.select_related('fk_imagenes').order_by('pk_productos_imagenes')[:1],
+                to_attr='imagenes_prefetch'
+            )
+        )
 
         data = ProductSerializer(productos, many=True).data
+        cache.set(cache_key, data, CATALOGO_TIMEOUT)
         return Response(data, status=HTTP_200_OK)
 
 # --------------------------------------------------------------------------
@@ -154,7 +177,7 @@ class CategoriaListView(APIView):
         """
         Devuelve todas las categorías disponibles.
         """
-        categorias = Categoria.objects.all().order_by('nombre')
+        categorias = Categoria.objects.select_related('imagen').order_by('nombre')
         data = CategoriaSerializer(categorias, many=True).data
         return Response(data, status=HTTP_200_OK)
 
@@ -242,16 +265,16 @@ class EditProductImageView(APIView):
             return Response({"error": "Producto no encontrado."}, status=HTTP_400_BAD_REQUEST)
 
         ext = os.path.splitext(archivo.name)[-1].lower()
-        if ext not in ['.jpg', '.jpeg', '.png']:
+        if ext not in ['.jpg', '.jpeg', '.png'] or not es_imagen_permitida(archivo):
             return Response({"error": "Formato inválido. Solo JPG o PNG."}, status=HTTP_400_BAD_REQUEST)
 
         # Guardar imagen con nombre lógico
         filename = f"assets/product_{producto_id}{ext}"
         ruta_publica = os.path.join("public", filename)
-        default_storage.save(ruta_publica, ContentFile(archivo.read()))
+        default_storage.save(ruta_publica, archivo)
 
         # Crear y asignar imagen en la base
-        imagen = Imagen.objects.create(uuid=uuid.uuid4(), extension=ext, nombre_logico=f"product_{producto_id}")
+        imagen = Imagen.objects.create(uuid=uuid.uuid4().hex, extension=ext, nombre_logico=f"product_{producto_id}")
         producto.imagen_destacada = imagen
         producto.save()
 
@@ -381,16 +404,16 @@ class CategorieImageView(APIView):
             return Response({"error": "Categoría no encontrada."}, status=HTTP_400_BAD_REQUEST)
 
         ext = os.path.splitext(archivo.name)[-1].lower()
-        if ext not in ['.jpg', '.jpeg', '.png']:
+        if ext not in ['.jpg', '.jpeg', '.png'] or not es_imagen_permitida(archivo):
             return Response({"error": "Formato inválido. Solo JPG o PNG."}, status=HTTP_400_BAD_REQUEST)
 
         # Guardar imagen con nombre lógico
         filename = f"assets/categorie_{categoria_id}{ext}"
         ruta_publica = os.path.join("public", filename)
-        default_storage.save(ruta_publica, ContentFile(archivo.read()))
+        default_storage.save(ruta_publica, archivo)
 
         # Crear y asignar imagen en la base
-        imagen = Imagen.objects.create(uuid=uuid.uuid4(), extension=ext, nombre_logico=f"categorie_{categoria_id}")
+        imagen = Imagen.objects.create(uuid=uuid.uuid4().hex, extension=ext, nombre_logico=f"categorie_{categoria_id}")
         categoria.imagen = imagen
         categoria.save()
 
@@ -452,6 +475,6 @@ class ExchangeProductView(APIView):
         )
 
         request.user.monedas_actuales -= producto.precio_monedas
-        request.user.save()
+        request.user.save(update_fields=['monedas_actuales'])
 
         return Response({"message": "Producto canjeado con éxito."}, status=HTTP_200_OK)
@@ -9,17 +9,16 @@ import uuid
 import os
 from django.db.models import Q
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.conf import settings
 
 from refit_app.serializers import (
     EditDailyObjetiveSerializer,
     EditPersonalDataSerializer,
-    LoginResponseSerializer,
     UserSerializer,
     PublicUserProfileSerializer
 )
 from refit_app.models import User, Imagen
+from refit_app.services.image_service import es_imagen_permitida
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +28,16 @@ logger = logging.getLogger(__name__)
 # Autor: Ignacio da Rosa – MVP 1 – 2025/04/28
 # Descripción: Vistas API relacionadas al perfil del usuario y su edición.
 # ============================================================================
+# --------------------------------------------------------------------------
+# Funciones auxiliares
+# --------------------------------------------------------------------------
+def serializar_perfil(user, request=None):
+    """
+    Serializa el perfil del usuario con pasos de hoy y ranking resueltos en una sola consulta.
+    """
+    usuario = UserSerializer.setup_eager_loading(User.objects.filter(pk=user.pk)).get()
+    return UserSerializer(usuario, context={'request': request}).data
+
 # --------------------------------------------------------------------------
 # Ver y editar perfil de usuario
 # --------------------------------------------------------------------------
@@ -43,9 +52,9 @@ class UserDetailView(APIView):
         """
         Devuelve los datos del usuario autenticado.
         """
-        serializer = UserSerializer(request.user, context={'request': request})
+        data = serializar_perfil(request.user, request)
         logger.info("Detalles del usuario autenticado recuperados.")
-        return Response(serializer.data, status=HTTP_200_OK)
+        return Response(data, status=HTTP_200_OK)
 
     def put(self, request):
         """
@@ -56,7 +65,7 @@ class UserDetailView(APIView):
         if serializer.is_valid():
             serializer.save()
             logger.info("Datos del usuario autenticado actualizados.")
-            data = UserSerializer(user).data
+            data = serializar_perfil(user, request)
             return Response(data, status=HTTP_200_OK)
         logger.error("Error al actualizar datos del usuario autenticado: %s", serializer.errors)
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
@@ -70,7 +79,7 @@ class UserDetailView(APIView):
         if serializer.is_valid():
             serializer.save()
             logger.info("Datos del usuario autenticado actualizados.")
-            return Response(UserSerializer(user).data, status=HTTP_200_OK)
+            return Response(serializar_perfil(user, request), status=HTTP_200_OK)
         logger.error("Error al actualizar datos del usuario autenticado: %s", serializer.errors)
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
@@ -87,7 +96,7 @@ class UserDetailView(APIView):
 
         user.blocked = True
         user.lock_date = timezone.now()
-        user.save()
+        user.save(update_fields=['blocked', 'lock_date', 'fecha_modificacion'])
 
         return Response({
             "message": "Cuenta marcada para eliminación lógica. Tienes 30 días para reactivarla con login."
@@ -111,7 +120,7 @@ class UploadProfilePictureView(APIView):
             return Response({"error": "No se ha enviado ninguna imagen."}, status=HTTP_400_BAD_REQUEST)
 
         ext = os.path.splitext(archivo.name)[-1].lower()
-        if ext not in ['.jpg', '.jpeg', '.png']:
+        if ext not in ['.jpg', '.jpeg', '.png'] or not es_imagen_permitida(archivo):
             return Response({"error": "Formato no permitido. Solo JPG o PNG."}, status=HTTP_400_BAD_REQUEST)
 
         user_id = request.user.id
@@ -129,18 +138,18 @@ class UploadProfilePictureView(APIView):
             Imagen.objects.filter(pk=request.user.image_id).delete()
 
         # Guardar nuevo archivo
-        default_storage.save(ruta_publica, ContentFile(archivo.read()))
+        default_storage.save(ruta_publica, archivo)
 
         # Crear nuevo registro en IMAGENES
         nueva_imagen = Imagen.objects.create(
-            uuid=uuid.uuid4(),
+            uuid=uuid.uuid4().hex,
             extension=ext,
             nombre_logico=nombre_logico
         )
 
         # Asignar nueva imagen al usuario
         request.user.image = nueva_imagen
-        request.user.save()
+        request.user.save(update_fields=['image', 'fecha_modificacion'])
 
         return Response({
             "message": "Imagen de perfil actualizada correctamente.",
@@ -222,7 +231,9 @@ class PublicUserProfileView(APIView):
         surname = request.query_params.get('surname')
 
         if user_id:
-            user = get_object_or_404(User, pk=user_id, is_active=True)
+            user = get_object_or_404(
+                PublicUserProfileSerializer.setup_eager_loading(User.objects.all()), pk=user_id, is_active=True
+            )
             serializer = PublicUserProfileSerializer(user, context={'request': request})
             return Response(serializer.data, status=HTTP_200_OK)
 
@@ -233,7 +244,7 @@ class PublicUserProfileView(APIView):
             if surname:
                 filters &= Q(apellidos__icontains=surname)
 
-            users = User.objects.filter(filters, is_active=True)
+            users = PublicUserProfileSerializer.setup_eager_loading(User.objects.filter(filters, is_active=True))
             serializer = PublicUserProfileSerializer(users, many=True, context={'request': request})
             return Response(serializer.data, status=HTTP_200_OK)
 
@@ -4,12 +4,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import Rank
 
 from refit_app.models import User, UserFollowing
 from refit_app.serializers import (
     LeaderBoardSerializer,
-    LoginResponseSerializer
+    LoginResponseSerializer,
+    build_profile_picture_url
 )
+from refit_app.services.cache_service import LEADERBOARD_TIMEOUT, LEADERBOARD_VERSION_KEY, obtener_version
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,7 @@ class FollowingFriendsView(APIView):
         Excluye al usuario autenticado y a los administradores.
         """
         usuarios = User.objects.exclude(pk=request.user.pk).exclude(is_staff=True)
+        usuarios = LeaderBoardSerializer.setup_eager_loading(usuarios)
         serializer = LeaderBoardSerializer(usuarios, many=True)
         logger.info("User %s requested following friends list.", request.user.email)
         return Response(serializer.data, status=HTTP_200_OK)
@@ -86,6 +92,7 @@ class FriendsView(APIView):
         amigos = User.objects.filter(
             pk__in=UserFollowing.objects.filter(user=request.user).values_list('following', flat=True)
         )
+        amigos = LeaderBoardSerializer.setup_eager_loading(amigos)
         serializer = LeaderBoardSerializer(amigos, many=True)
         logger.info("User %s requested list of friends.", request.user.email)
         return Response(serializer.data, status=HTTP_200_OK)
@@ -98,17 +105,40 @@ class LeaderboardView(APIView):
     Devuelve el top 5 de usuarios con más pasos en el sistema.
     """
     permission_classes = [IsAuthenticated]
+    top_size = 5
 
     def get(self, request):
-        top_users = User.objects.filter(is_staff=False).order_by('-pasos_totales')[:5]
-        serializer = LeaderBoardSerializer(top_users, many=True, context={'request': request})
+        # Respuesta igual para todos los usuarios: se cachea unos segundos (ver LEADERBOARD_TIMEOUT)
+        # y solo se consulta la base cuando la entrada expiró o cambió la versión.
+        cache_key = f"leaderboard:{obtener_version(LEADERBOARD_VERSION_KEY)}:top{self.top_size}"
+        data = cache.get_or_set(cache_key, self.build_top, LEADERBOARD_TIMEOUT)
+        return Response(data, status=HTTP_200_OK)
 
-        # Agregar campo de ranking manualmente
-        data = serializer.data
-        for idx, user in enumerate(data, start=1):
-            user["ranking"] = idx
+    def build_top(self):
+        """
+        Arma el top del ranking directamente desde la base.
+        """
+        # Posición calculada en SQL con RANK(): mismo criterio que leaderboard_position
+        # (los empates comparten posición) y solo se traen las primeras filas.
+        top_users = LeaderBoardSerializer.setup_eager_loading(
+            User.objects.filter(is_staff=False)
+        ).annotate(
+            ranking=Window(expression=Rank(), order_by=F('pasos_totales').desc())
+        ).order_by('-pasos_totales', 'pk')[:self.top_size]
 
-        return Response(data, status=HTTP_200_OK)
+        # Endpoint de alto tráfico: se arma la respuesta directamente, sin el pipeline de campos de DRF.
+        # Mismas claves que LeaderBoardSerializer más el ranking.
+        data = [
+            {
+                "id": user.id,
+                "image": build_profile_picture_url(user.image),
+                "name": user.full_name,
+                "steps": user.pasos_totales,
+                "ranking": user.ranking,
+            }
+            for user in top_users
+        ]
+        return data
     
 # --------------------------------------------------------------------------
 # Ranking del usuario autenticado
@@ -123,14 +153,8 @@ class UsuarioRankingView(APIView):
         """
         Devuelve la posición del usuario autenticado en el ranking de pasos.
         """
-        usuarios = User.objects.filter(is_staff=False).order_by('-pasos_totales').values_list('id', flat=True)
-        try:
-            posicion = list(usuarios).index(request.user.id) + 1
-        except ValueError:
-            posicion = None
-
-        serializer = LoginResponseSerializer(request.user)
-        data = serializer.data
-        data['leaderBoardPosition'] = posicion
+        # La posición en el ranking llega anotada en la misma consulta del usuario
+        usuario = LoginResponseSerializer.setup_eager_loading(User.objects.filter(pk=request.user.pk)).get()
+        data = LoginResponseSerializer(usuario).data
 
         return Response(data, status=HTTP_200_OK) 
\ No newline at end of file
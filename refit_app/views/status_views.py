@@ -24,7 +24,7 @@ class RefreshTimestampView(APIView):
         Actualiza el campo 'ultimo_login' del usuario con la hora actual.
         """
         request.user.last_login  = timezone.now()
-        request.user.save()
+        request.user.save(update_fields=['last_login'])
         return Response({
             "ultimo_login": request.user.ultimo_login
         })
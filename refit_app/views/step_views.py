@@ -111,7 +111,7 @@ class StepUpdateView(APIView):
                 monedas_adicionales = int((total_nuevos_pasos * multiplicador) // 200)
                 request.user.monedas_actuales += monedas_adicionales
                 request.user.last_sync = timezone.now()
-                request.user.save()
+                request.user.save(update_fields=['pasos_totales', 'monedas_actuales', 'last_sync'])
 
             logger.info("%s agregó %s pasos (x%.1f). Monedas: +%s", request.user.email, total_nuevos_pasos, multiplicador, monedas_adicionales)
 
@@ -4,15 +4,13 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_201_CREATED
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q
 from datetime import date, timedelta
 from django.shortcuts import get_object_or_404
 
-from refit_app.models import ObjetivoDiario, UsuarioObjetivoDiario, User
+from refit_app.models import ObjetivoDiario, UsuarioObjetivoDiario
 from refit_app.serializers import (
     ObjetivoDiarioSerializer,
-    UsuarioObjetivoDiarioSerializer,
-    EditDailyObjetiveSerializer,
     SimpleObjetivoDiarioSerializer,
     CheckDailyTaskSerializer,
     ExchangeDailyTaskSerializer
@@ -43,7 +41,7 @@ def calcular_multiplicador(user):
             # 🔁 Reinicia si no se completaron todos los objetivos en ese intervalo
             user.racha = 0
             user.racha_updated_at = None
-            user.save()
+            user.save(update_fields=['racha', 'racha_updated_at'])
             return 1.0  # Valor base
         
     return min(2.0, 1.0 + 0.1 * user.racha)
@@ -161,7 +159,8 @@ class CheckDailyTaskView(APIView):
         Marca una tarea diaria como completada.
         Si el usuario completa todas las tareas del día, se incrementa su racha.
         """
-        serializer = CheckDailyTaskSerializer(data=request.data, context={'request': request})
+        hoy = date.today()
+        serializer = CheckDailyTaskSerializer(data=request.data, context={'request': request, 'hoy': hoy})
 
         if not serializer.is_valid():
             logger.error("Error al verificar tarea diaria: %s", serializer.errors)
@@ -177,30 +176,27 @@ class CheckDailyTaskView(APIView):
         if tarea.fecha_completado:
             return Response({"message": "La tarea ya fue marcada como completada."}, status=HTTP_200_OK)
 
-        if not puede_completar_objetivo(tarea):
+        if not puede_completar_objetivo(tarea, hoy):
             return Response({"error": "No se alcanzó el requisito del objetivo."}, status=HTTP_400_BAD_REQUEST)
 
         # Marcar como completada
         tarea.fecha_completado = timezone.now()
-        tarea.save()
+        tarea.save(update_fields=['fecha_completado'])
         logger.info("Tarea %s marcada como completada para %s", tarea.pk, request.user.email)
 
-        # Verificar si el usuario completó todas las tareas del día
-        hoy = date.today()
-        completadas = UsuarioObjetivoDiario.objects.filter(
-            fk_usuarios=request.user,
-            fecha_creacion=hoy,
-            fecha_completado__isnull=False
-        ).count()
-        total = UsuarioObjetivoDiario.objects.filter(
+        # Verificar si el usuario completó todas las tareas del día (ambos conteos en una sola consulta)
+        estado = UsuarioObjetivoDiario.objects.filter(
             fk_usuarios=request.user,
             fecha_creacion=hoy
-        ).count()
+        ).aggregate(
+            total=Count('pk'),
+            completadas=Count('pk', filter=Q(fecha_completado__isnull=False))
+        )
 
-        if completadas == total:
+        if estado['completadas'] == estado['total']:
             request.user.racha += 1
             request.user.racha_updated_at = timezone.now()
-            request.user.save()
+            request.user.save(update_fields=['racha', 'racha_updated_at'])
             logger.info("%s completó todos los objetivos. Racha actual: %s", request.user.email, request.user.racha)
 
         return Response({"message": "Tarea completada correctamente."}, status=HTTP_200_OK)
@@ -228,11 +224,11 @@ class ExchangeDailyTaskView(APIView):
 
             # Validación ya fue hecha en el serializer (completado y no canjeado)
             tarea.fecha_canjeado = timezone.now()
-            tarea.save()
+            tarea.save(update_fields=['fecha_canjeado'])
 
             premio_base = tarea.fk_objetivos_diarios.premio
             request.user.monedas_actuales += premio_base
-            request.user.save()
+            request.user.save(update_fields=['monedas_actuales'])
 
             logger.info("Tarea %s canjeada por %s. Premio: %s", tarea.pk, request.user.email, premio_base)
 